@@ -42,12 +42,19 @@ class Settings(BaseSettings):
     # Autonomous behavior
     heartbeat_min_sec: int = 1800  # 30 min
     heartbeat_max_sec: int = 3600  # 60 min
+    heartbeat_max_backoff: int = Field(default=8, ge=1)  # cap on the idle-streak interval multiplier
 
     # Daily newspaper
     daily_newspaper_hour: int = 21  # UTC hour to send daily newspaper
 
+    # Database maintenance
+    db_maintenance_hour: int = 4  # UTC hour for incremental vacuum + PRAGMA optimize
+
     # Reflection & consolidation
-    reflection_every_n_heartbeats: int = 10
+    # Both are used as modulo divisors in ReflectionEngine.should_trigger
+    reflection_every_n_heartbeats: int = Field(default=10, ge=1)
+    zero_engagement_check_every: int = Field(default=3, ge=1)  # heartbeats between zero-engagement checks
+    reflection_cache_ttl_hours: float = 6.0  # reuse a self-critique while metrics are unchanged
     consolidation_interval_min: int = 15
     episode_compression_age_hours: int = 48
     episode_compression_importance_threshold: float = 5.0
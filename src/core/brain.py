@@ -28,6 +28,7 @@ class Brain:
         self._client = client or create_llm_client()
         self._model = settings.llm_model
         self._system_prompt = build_system_prompt(identity=self._identity)
+        self._cache_identity_views()
         self._memory = memory  # MemoryManager, set later if needed
 
     def set_memory(self, memory) -> None:
@@ -41,12 +42,25 @@ class Brain:
             name=self._name, description=self._description, strategy=self._strategy
         )
         self._system_prompt = build_system_prompt(identity=self._identity)
+        self._cache_identity_views()
         logger.info("System prompt reloaded")
 
+    def _cache_identity_views(self) -> None:
+        self._constitution = self._identity.get("constitution", {})
+        self._goals = self._identity.get("strategy", {}).get("goals", {})
+
     @property
     def identity(self) -> dict:
         return self._identity
 
+    @property
+    def constitution(self) -> dict:
+        return self._constitution
+
+    @property
+    def goals(self) -> dict:
+        return self._goals
+
     async def _ask(self, user_prompt: str, max_tokens: int = 1024, action: str = "unknown") -> str:
         """Send a single-turn message and return the text response."""
         system = self._system_prompt
@@ -72,11 +72,12 @@ class ConsolidationEngine:
                 )
                 summary = resp.choices[0].message.content.strip()
                 ids = [e["id"] for e in batch]
-                await self._storage.delete_episodes(ids)
-                await self._storage.add_episode(
-                    "compressed_summary", summary, importance=6.0,
-                    metadata={"original_count": len(batch), "original_ids": ids},
-                )
+                async with self._storage.transaction():
+                    await self._storage.delete_episodes(ids)
+                    await self._storage.add_episode(
+                        "compressed_summary", summary, importance=6.0,
+                        metadata={"original_count": len(batch), "original_ids": ids},
+                    )
                 total_compressed += len(batch)
             except Exception:
                 logger.exception("Episode compression failed for batch")
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 from collections import defaultdict
 from dataclasses import dataclass
+from types import SimpleNamespace
 
 import openai
 
@@ -53,6 +54,9 @@ class _Completions:
             try:
                 kwargs["model"] = p.model
                 resp = await p.client.chat.completions.create(**kwargs)
+                if kwargs.get("stream"):
+                    prompt_chars = sum(len(m.get("content") or "") for m in kwargs.get("messages", []))
+                    return _UsageStream(resp, self, p.name, p.model, action, prompt_chars)
                 await self._record(p.name, p.model, action, resp)
                 return resp
             except Exception as e:
@@ -86,6 +90,54 @@ class _Completions:
                 logger.debug("Failed to persist LLM usage to DB", exc_info=True)
 
 
+class _UsageStream:
+    """Streamed completion that records usage once per request.
+
+    The final chunk carries exact usage when the request sets
+    ``stream_options={"include_usage": True}``; a consumer that hangs up
+    before it gets a rough chars/4 estimate recorded on close().
+    """
+
+    def __init__(
+        self, stream, completions: _Completions, provider: str, model: str, action: str,
+        prompt_chars: int,
+    ):
+        self._stream = stream
+        self._completions = completions
+        self._provider = provider
+        self._model = model
+        self._action = action
+        self._prompt_chars = prompt_chars
+        self._completion_chars = 0
+        self._recorded = False
+        self._it = None
+
+    def __aiter__(self):
+        self._it = self._stream.__aiter__()
+        return self
+
+    async def __anext__(self):
+        chunk = await self._it.__anext__()
+        if chunk.choices:
+            self._completion_chars += len(chunk.choices[0].delta.content or "")
+        if getattr(chunk, "usage", None) and not self._recorded:
+            self._recorded = True
+            await self._completions._record(self._provider, self._model, self._action, chunk)
+        return chunk
+
+    async def close(self) -> None:
+        await self._stream.close()
+        if not self._recorded:
+            self._recorded = True
+            usage = SimpleNamespace(
+                prompt_tokens=(self._prompt_chars + 3) // 4,
+                completion_tokens=(self._completion_chars + 3) // 4,
+            )
+            await self._completions._record(
+                self._provider, self._model, self._action, SimpleNamespace(usage=usage),
+            )
+
+
 class _Chat:
     def __init__(self, providers: list[_Provider], usage: dict, storage=None):
         self.completions = _Completions(providers, usage, storage)
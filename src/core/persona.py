@@ -1,14 +1,41 @@
 from __future__ import annotations
 
+import copy
+import functools
+import hashlib
 import json
+import re
+from collections import OrderedDict
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 
+import openai
 import yaml
 
+from src import jsonutil
 from src.config import settings
 
 
-DEFAULT_STRATEGY: dict = {
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    """Inverse of _freeze: build plain, mutable dicts and lists."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(v) for v in value]
+    return value
+
+
+DEFAULT_STRATEGY: Mapping = _freeze({
     "version": 1,
     "goals": {
         "mission": "Become a respected voice in AI safety and philosophy on Moltbook",
@@ -40,13 +67,24 @@ DEFAULT_STRATEGY: dict = {
         "active": ["general", "technology", "philosophy"],
         "watching": [],
     },
-}
+})
+
+# Rendered layered prompts keyed by a stable identity hash, so an unchanged
+# identity always yields the very same string (keeps upstream prompt caches warm).
+_PROMPT_CACHE: OrderedDict[bytes, str] = OrderedDict()
+_PROMPT_CACHE_SIZE = 16
+
+_JSON_OBJ_RE = re.compile(rb"\{.*\}", re.S)
+
+
+def copy_default_strategy() -> dict:
+    """Return a mutable deep copy of DEFAULT_STRATEGY for callers that edit it."""
+    return _thaw(DEFAULT_STRATEGY)
 
 
 def load_persona(path: str = "config/persona.yaml", name: str = "", description: str = "") -> dict:
     """Load persona config from YAML file, overlaying name/description. Backward compat wrapper."""
-    with open(Path(path), encoding="utf-8") as f:
-        persona = yaml.safe_load(f) or {}
+    persona = _read_yaml(Path(path))
     persona["name"] = name or "agent"
     persona["description"] = description or ""
     return persona
@@ -57,7 +95,17 @@ def load_constitution(path: str = "config/constitution.yaml") -> dict:
     p = Path(path)
     if not p.exists():
         return {}
-    with open(p, encoding="utf-8") as f:
+    return _read_yaml(p)
+
+
+def _read_yaml(p: Path) -> dict:
+    """Parse a YAML config file once per modification time; callers get a private copy."""
+    return copy.deepcopy(_parse_yaml(str(p), p.stat().st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_yaml(path: str, mtime_ns: int) -> dict:
+    with open(path, encoding="utf-8") as f:
         return yaml.safe_load(f) or {}
 
 
@@ -68,7 +116,10 @@ def load_identity(
     description: str = "",
     strategy: dict | None = None,
 ) -> dict:
-    """Load full identity: constitution + strategy + persona."""
+    """Load full identity: constitution + strategy + persona.
+
+    Without an explicit strategy the frozen DEFAULT_STRATEGY is shared by reference.
+    """
     return {
         "constitution": load_constitution(constitution_path),
         "strategy": strategy if strategy is not None else DEFAULT_STRATEGY,
@@ -83,12 +134,33 @@ def build_system_prompt(identity: dict | None = None, persona: dict | None = Non
     or a legacy persona dict for backward compatibility.
     """
     if identity and "constitution" in identity:
-        return _build_layered_prompt(identity)
+        key = _identity_key(identity)
+        cached = _PROMPT_CACHE.get(key)
+        if cached is not None:
+            _PROMPT_CACHE.move_to_end(key)
+            return cached
+        prompt = _build_layered_prompt(identity)
+        _PROMPT_CACHE[key] = prompt
+        if len(_PROMPT_CACHE) > _PROMPT_CACHE_SIZE:
+            _PROMPT_CACHE.popitem(last=False)
+        return prompt
     # Legacy path
     p = persona or identity or {}
     return _build_legacy_prompt(p)
 
 
+def _identity_key(identity: dict) -> bytes:
+    """Stable digest of an identity, independent of dict insertion order."""
+    raw = json.dumps(identity, sort_keys=True, default=_json_default).encode()
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _json_default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
 def _build_layered_prompt(identity: dict) -> str:
     constitution = identity.get("constitution", {})
     strategy = identity.get("strategy", {})
@@ -181,6 +253,13 @@ def _build_legacy_prompt(persona: dict) -> str:
     )
 
 
+@functools.lru_cache(maxsize=1)
+def _shared_client():
+    """Single LLM client reused across identity generations (built on first use)."""
+    from src.core.llm import create_llm_client
+    return create_llm_client()
+
+
 async def generate_identity(taken_names: list[str] | None = None) -> dict:
     """Ask LLM to generate agent name and description based on persona."""
     persona = load_persona()
@@ -192,25 +271,40 @@ async def generate_identity(taken_names: list[str] | None = None) -> dict:
     if taken_names:
         taken_note = f"\n\nThese names are already taken, pick something different: {', '.join(taken_names)}"
 
-    from src.core.llm import create_llm_client
-    client = create_llm_client()
-    resp = await client.chat.completions.create(
-        max_tokens=256,
-        _action="generate_identity",
-        messages=[{
-            "role": "user",
-            "content": (
-                "You are creating an identity for an AI agent on Moltbook (a social network for AI agents).\n\n"
-                f"Interests: {interests}\n"
-                f"Personality: {tone}\n"
-                f"{taken_note}\n\n"
-                "Generate a unique agent name (one word, CamelCase, creative, memorable) "
-                "and a short description (1-2 sentences).\n\n"
-                "Return ONLY a JSON object: {\"name\": \"...\", \"description\": \"...\"}"
-            ),
-        }],
-    )
-    text = resp.choices[0].message.content.strip()
-    start = text.find("{")
-    end = text.rfind("}") + 1
-    return json.loads(text[start:end])
+    messages = [{
+        "role": "user",
+        "content": (
+            "You are creating an identity for an AI agent on Moltbook (a social network for AI agents).\n\n"
+            f"Interests: {interests}\n"
+            f"Personality: {tone}\n"
+            f"{taken_note}\n\n"
+            "Generate a unique agent name (one word, CamelCase, creative, memorable) "
+            "and a short description (1-2 sentences), as JSON with keys \"name\" and \"description\"."
+        ),
+    }]
+
+    client = _shared_client()
+    try:
+        resp = await client.chat.completions.create(
+            max_tokens=256,
+            _action="generate_identity",
+            messages=messages,
+            response_format={"type": "json_object"},
+        )
+    except openai.BadRequestError:
+        # Provider without JSON mode — ask again and scan the free-form reply
+        resp = await client.chat.completions.create(
+            max_tokens=256,
+            _action="generate_identity",
+            messages=messages,
+        )
+
+    content = resp.choices[0].message.content or ""
+    try:
+        return jsonutil.loads(content)
+    except ValueError:
+        pass
+    match = _JSON_OBJ_RE.search(content.encode())
+    if not match:
+        raise ValueError("No JSON object in identity response")
+    return jsonutil.loads(match.group(0))
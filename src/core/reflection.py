@@ -1,18 +1,29 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import copy
 import logging
+import time
+from collections import OrderedDict
 
 import openai
 import yaml
 
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper, SafeLoader
+
 from src.core.memory import MemoryManager
-from src.core.persona import DEFAULT_STRATEGY
+from src.core.persona import copy_default_strategy
+from src import jsonutil
 from src.config import settings
 from src.storage.db import Storage
 
 logger = logging.getLogger(__name__)
 
+_REFLECTION_CACHE_SIZE = 32
+
 
 class ReflectionEngine:
     def __init__(
@@ -28,27 +39,43 @@ class ReflectionEngine:
         self._client = client
         self._model = model
         self._constitution = constitution
+        self._constitution_block = _constitution_block(constitution)
+        # (version, created_at) -> parsed strategy; avoids re-parsing YAML each step
+        self._strategy_cache: tuple[tuple, dict] | None = None
+        # (strategy version, metrics signature) -> (reflection text, monotonic time)
+        self._reflection_cache: OrderedDict[tuple, tuple[str, float]] = OrderedDict()
 
     async def _get_strategy(self) -> dict:
         """Load current strategy from DB, falling back to DEFAULT_STRATEGY."""
         row = await self._storage.get_latest_strategy_version()
-        if row and row.get("strategy_yaml"):
-            return yaml.safe_load(row["strategy_yaml"])
-        return DEFAULT_STRATEGY.copy()
-
-    async def should_trigger(self) -> tuple[bool, str]:
-        """Check if reflection should run."""
-        hb_count = await self._storage.get_state("heartbeat_count")
-        count = int(hb_count) if hb_count else 0
-
-        if count > 0 and count % settings.reflection_every_n_heartbeats == 0:
-            return True, f"Every {settings.reflection_every_n_heartbeats} heartbeats (count={count})"
-
-        # Check for zero-engagement post
-        recent_posts = await self._storage.get_own_posts(limit=1)
+        if not row or not row.get("strategy_yaml"):
+            return copy_default_strategy()
+        key = (row.get("version"), row.get("created_at"))
+        if self._strategy_cache is None or self._strategy_cache[0] != key:
+            self._strategy_cache = (key, yaml.load(row["strategy_yaml"], Loader=SafeLoader))
+        return copy.deepcopy(self._strategy_cache[1])
+
+    async def should_trigger(self, count: int | None = None) -> tuple[bool, str]:
+        """Check if reflection should run.
+
+        Callers that already know the heartbeat count pass it to skip the state read.
+        """
+        if count is None:
+            hb_count = await self._storage.get_state("heartbeat_count")
+            count = int(hb_count) if hb_count else 0
+
+        every = settings.reflection_every_n_heartbeats
+        if count > 0 and count % every == 0:
+            return True, f"Every {every} heartbeats (count={count})"
+
+        # Check for zero-engagement post, but only every few heartbeats
+        if count % min(every, settings.zero_engagement_check_every):
+            return False, ""
+        recent_posts, episodes = await asyncio.gather(
+            self._storage.get_own_posts(limit=1),
+            self._storage.get_recent_episodes(limit=5, type="post"),
+        )
         if recent_posts:
-            last = recent_posts[0]
-            episodes = await self._storage.get_recent_episodes(limit=5, type="post")
             for ep in episodes:
                 meta = ep.get("metadata", {})
                 if meta.get("zero_engagement"):
@@ -60,26 +87,31 @@ class ReflectionEngine:
         """Execute the 5-step Reflexion protocol."""
         logger.info("Starting reflection cycle")
 
-        metrics = await self._evaluate()
-        reflection = await self._reflect(metrics)
-        proposals = await self._propose(reflection)
-        validated = await self._validate(proposals)
-        result = await self._commit_or_reject(validated)
+        metrics, strategy = await asyncio.gather(self._evaluate(), self._get_strategy())
+        prefix = self._shared_prefix(yaml.dump(strategy, Dumper=SafeDumper, default_flow_style=False), metrics)
+        reflection = await self._reflect(prefix, metrics, strategy.get("version", 1))
+        validated = await self._propose_and_validate(prefix, reflection)
+        result, audit = await self._commit_or_reject(validated, strategy)
 
-        await self._memory.remember(
+        pending = [self._memory.remember(
             "reflection",
-            f"Reflection cycle completed: {json.dumps(result, default=str)[:500]}",
-            metadata={"metrics": metrics, "proposals_count": len(proposals), "accepted": result.get("accepted", 0)},
-        )
+            f"Reflection cycle completed: {jsonutil.dumps(result, default=str)[:500]}",
+            metadata={"metrics": metrics, "proposals_count": len(validated), "accepted": result.get("accepted", 0)},
+        )]
+        if audit is not None:
+            pending.append(self._storage.audit("reflection", audit))
+        await asyncio.gather(*pending)
 
         logger.info("Reflection cycle done: %s", result)
         return result
 
     async def _evaluate(self) -> dict:
         """Step 1: Gather performance metrics."""
-        stats = await self._storage.get_stats()
-        episodes = await self._storage.get_recent_episodes(limit=20)
-        insights = await self._storage.get_insights(min_confidence=0.3)
+        stats, episodes, insights = await asyncio.gather(
+            self._storage.get_stats(),
+            self._storage.get_recent_episodes(limit=20),
+            self._storage.get_insights(min_confidence=0.3),
+        )
 
         action_counts: dict[str, int] = {}
         for ep in episodes:
@@ -98,13 +130,30 @@ class ReflectionEngine:
             "insight_count": len(insights),
         }
 
-    async def _reflect(self, metrics: dict) -> str:
-        """Step 2: LLM self-critique."""
-        strategy = await self._get_strategy()
+    def _shared_prefix(self, strategy_yaml: str, metrics: dict) -> str:
+        """System message shared by steps 2-4 of a cycle.
+
+        Kept byte-identical across the cycle's LLM calls so providers with prefix
+        caching only bill the step-specific tail after the first request.
+        """
+        return (
+            "You are a Moltbook AI agent reviewing and tuning your own strategy.\n\n"
+            f"{self._constitution_block}"
+            f"Current strategy:\n{strategy_yaml}\n\n"
+            f"Performance metrics:\n{jsonutil.dumps(metrics, indent=True)}"
+        )
+
+    async def _reflect(self, prefix: str, metrics: dict, version: int) -> str:
+        """Step 2: LLM self-critique (reused while strategy and metrics look the same)."""
+        key = (version, _metrics_signature(metrics))
+        hit = self._reflection_cache.get(key)
+        if hit and time.monotonic() - hit[1] < settings.reflection_cache_ttl_hours * 3600:
+            self._reflection_cache.move_to_end(key)
+            logger.info("Reusing cached reflection for strategy v%s", version)
+            return hit[0]
+
         prompt = (
-            "You are reflecting on your recent performance as a Moltbook AI agent.\n\n"
-            f"Current strategy:\n{yaml.dump(strategy, default_flow_style=False)}\n\n"
-            f"Performance metrics:\n{json.dumps(metrics, indent=2)}\n\n"
+            "Reflect on your recent performance.\n\n"
             "Analyze:\n"
             "1. What went well?\n"
             "2. What could be improved?\n"
@@ -116,7 +165,10 @@ class ReflectionEngine:
             resp = await self._client.chat.completions.create(
                 model=self._model,
                 max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": prefix},
+                    {"role": "user", "content": prompt},
+                ],
                 _action="reflect",
             )
             reflection_text = resp.choices[0].message.content
@@ -125,152 +177,207 @@ class ReflectionEngine:
                 "reflection_thought", reflection_text[:500],
                 metadata={"metrics_snapshot": metrics},
             )
+            self._reflection_cache[key] = (reflection_text, time.monotonic())
+            if len(self._reflection_cache) > _REFLECTION_CACHE_SIZE:
+                self._reflection_cache.popitem(last=False)
             return reflection_text
         except Exception:
             logger.exception("Reflection step failed")
             return "Reflection failed — no changes proposed."
 
-    async def _propose(self, reflection: str) -> list[dict]:
-        """Step 3: Propose strategy changes based on reflection."""
-        strategy = await self._get_strategy()
+    async def _propose_and_validate(self, prefix: str, reflection: str) -> list[dict]:
+        """Steps 3-4: Propose strategy changes and check them against the constitution."""
         prompt = (
             "Based on this self-reflection, propose specific strategy changes.\n\n"
             f"Reflection:\n{reflection}\n\n"
-            f"Current strategy:\n{yaml.dump(strategy, default_flow_style=False)}\n\n"
             "Propose 0-3 changes. Each change should be:\n"
             "- Specific and actionable\n"
             "- A modification to the strategy YAML\n\n"
+            "Then validate each change against the constitutional values, safety rules "
+            "and performance constraints above, and mark whether it is SAFE to apply.\n\n"
             "Return ONLY a JSON array of objects:\n"
-            "[{\"field\": \"path.to.field\", \"old_value\": \"...\", \"new_value\": \"...\", \"reason\": \"...\"}]\n"
-            "Return [] if no changes needed."
+            "[{\"field\": \"path.to.field\", \"old_value\": \"...\", \"new_value\": \"...\", "
+            "\"reason\": \"...\", \"approved\": true/false, \"approval_reason\": \"...\"}]\n"
+            "If no changes are needed, reply with just []."
         )
         try:
-            resp = await self._client.chat.completions.create(
+            stream = await self._client.chat.completions.create(
                 model=self._model,
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}],
+                max_tokens=512,
+                messages=[
+                    {"role": "system", "content": prefix},
+                    {"role": "user", "content": prompt},
+                ],
+                stream=True,
+                stream_options={"include_usage": True},
                 _action="reflect_propose",
             )
-            text = resp.choices[0].message.content.strip()
-            start = text.find("[")
-            end = text.rfind("]") + 1
-            if start != -1 and end > start:
-                return json.loads(text[start:end])
-            return []
+            return _extract_json_array(await _read_json_array(stream))
         except Exception:
             logger.exception("Proposal step failed")
             return []
 
-    async def _validate(self, proposals: list[dict]) -> list[dict]:
-        """Step 4: Check proposals against constitution."""
-        if not proposals:
-            return []
-
-        safety_rules = self._constitution.get("safety", {}).get("rules", [])
-        values = self._constitution.get("identity", {}).get("values", [])
-        perf = self._constitution.get("performance", {})
-
-        prompt = (
-            "Validate these proposed strategy changes against constitutional rules.\n\n"
-            f"Constitutional values:\n" + "\n".join(f"- {v}" for v in values) + "\n\n"
-            f"Safety rules:\n" + "\n".join(f"- {r}" for r in safety_rules) + "\n\n"
-            f"Performance constraints:\n{json.dumps(perf, indent=2)}\n\n"
-            f"Proposals:\n{json.dumps(proposals, indent=2)}\n\n"
-            "For each proposal, decide if it's SAFE to apply.\n"
-            "Return ONLY a JSON array with each proposal + \"approved\": true/false:\n"
-            "[{\"field\": \"...\", \"new_value\": \"...\", \"reason\": \"...\", \"approved\": true/false}]"
-        )
-        try:
-            resp = await self._client.chat.completions.create(
-                model=self._model,
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}],
-                _action="reflect_validate",
-            )
-            text = resp.choices[0].message.content.strip()
-            start = text.find("[")
-            end = text.rfind("]") + 1
-            if start != -1 and end > start:
-                return json.loads(text[start:end])
-            return []
-        except Exception:
-            logger.exception("Validation step failed")
-            return []
+    async def _commit_or_reject(
+        self, validated: list[dict], strategy: dict,
+    ) -> tuple[dict, dict | None]:
+        """Step 5: Apply approved changes and save new version to DB.
 
-    async def _commit_or_reject(self, validated: list[dict]) -> dict:
-        """Step 5: Apply approved changes and save new version to DB."""
+        Returns (result, audit_details); the caller writes the audit entry so it
+        can run alongside the cycle's memory write.
+        """
         approved = [p for p in validated if p.get("approved", False)]
         rejected = [p for p in validated if not p.get("approved", False)]
 
         if not approved:
+            audit = None
             if validated:
-                await self._storage.audit("reflection", {
+                audit = {
                     "proposals": [
                         {
                             "field": p.get("field"), "old_value": p.get("old_value"),
                             "new_value": p.get("new_value"), "reason": p.get("reason"),
-                            "approved": False,
+                            "approved": False, "approval_reason": p.get("approval_reason"),
                         }
                         for p in rejected
                     ],
                     "old_version": None, "new_version": None,
-                })
-            return {"accepted": 0, "rejected": len(rejected), "changes": []}
+                }
+            return {"accepted": 0, "rejected": len(rejected), "changes": []}, audit
 
-        strategy = await self._get_strategy()
         old_version = strategy.get("version", 1)
         changes_applied = []
 
+        # Resolve every target before mutating; proposals sharing a parent walk it once
+        parents: dict[tuple[str, ...], dict | None] = {}
+        writes: list[tuple[dict, str, str, object]] = []
         for proposal in approved:
             field_path = proposal.get("field", "")
             new_value = proposal.get("new_value")
             if not field_path or new_value is None:
                 continue
-            if _apply_nested(strategy, field_path, new_value):
-                changes_applied.append(field_path)
+            keys = field_path.split(".")
+            prefix, leaf = tuple(keys[:-1]), keys[-1]
+            if prefix not in parents:
+                parents[prefix] = _resolve_parent(strategy, prefix)
+            parent = parents[prefix]
+            if parent is None:
+                logger.warning("Skipping proposal for unknown strategy path: %s", field_path)
+                continue
+            writes.append((parent, leaf, field_path, new_value))
+
+        for parent, leaf, field_path, new_value in writes:
+            parent[leaf] = new_value
+            changes_applied.append(field_path)
 
         if changes_applied:
             strategy["version"] = old_version + 1
 
             await self._storage.save_strategy_version(
                 version=strategy["version"],
-                yaml_text=yaml.dump(strategy, default_flow_style=False),
+                yaml_text=yaml.dump(strategy, Dumper=SafeDumper, default_flow_style=False),
                 parent=old_version,
                 trigger="reflection",
                 perf=None,
             )
+            self._strategy_cache = None
 
         all_proposals = [
             {
                 "field": p.get("field"), "old_value": p.get("old_value"),
                 "new_value": p.get("new_value"), "reason": p.get("reason"),
-                "approved": p.get("approved", False),
+                "approved": p.get("approved", False), "approval_reason": p.get("approval_reason"),
             }
             for p in validated
         ]
-        await self._storage.audit("reflection", {
+        audit = {
             "proposals": all_proposals,
             "old_version": old_version,
             "new_version": strategy.get("version", old_version),
-        })
+        }
 
         return {
             "accepted": len(approved),
             "rejected": len(rejected),
             "changes": changes_applied,
             "new_version": strategy.get("version", old_version),
-        }
-
-
-def _apply_nested(d: dict, path: str, value) -> bool:
-    """Apply a value to a nested dict path like 'goals.mission'."""
-    keys = path.split(".")
+        }, audit
+
+
+def _constitution_block(constitution: dict) -> str:
+    """Render the constitution section of the reflection prompt (fixed for the process)."""
+    safety_rules = constitution.get("safety", {}).get("rules", [])
+    values = constitution.get("identity", {}).get("values", [])
+    perf = constitution.get("performance", {})
+    return (
+        f"Constitutional values:\n" + "\n".join(f"- {v}" for v in values) + "\n\n"
+        f"Safety rules:\n" + "\n".join(f"- {r}" for r in safety_rules) + "\n\n"
+        f"Performance constraints:\n{jsonutil.dumps(perf, indent=True)}\n\n"
+    )
+
+
+def _metrics_signature(metrics: dict) -> tuple:
+    """Coarse fingerprint of cycle metrics for the reflection cache.
+
+    Lifetime stats counters are left out since they change every cycle.
+    """
+    return (
+        tuple(sorted(metrics.get("action_distribution", {}).items())),
+        round(metrics.get("avg_importance", 0.0) * 2) / 2,
+        metrics.get("insight_count", 0),
+    )
+
+
+async def _read_json_array(stream) -> str:
+    """Collect a streamed reply, hanging up as soon as the top-level JSON array closes."""
+    text = ""
+    depth = 0
+    in_str = escape = False
+    result = None
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            start = len(text)
+            text += chunk.choices[0].delta.content or ""
+            for i in range(start, len(text)):
+                ch = text[i]
+                if in_str:
+                    if escape:
+                        escape = False
+                    elif ch == "\\":
+                        escape = True
+                    elif ch == '"':
+                        in_str = False
+                elif ch == "[":
+                    depth += 1
+                elif depth and ch == '"':
+                    in_str = True
+                elif depth and ch == "]":
+                    depth -= 1
+                    if not depth:
+                        result = text[:i + 1]
+                        break
+            if result is not None:
+                break
+    finally:
+        await stream.close()
+    return text if result is None else result
+
+
+def _extract_json_array(text: str) -> list:
+    """Parse the outermost [...] span of an LLM reply ([] if there is none)."""
+    start = text.find("[")
+    end = text.rfind("]") + 1
+    if start != -1 and end > start:
+        return jsonutil.loads(text[start:end])
+    return []
+
+
+def _resolve_parent(d: dict, keys: tuple[str, ...]) -> dict | None:
+    """Walk to the dict holding the leaf of a path like 'goals.mission' (None if missing)."""
     target = d
-    for key in keys[:-1]:
-        if key not in target or not isinstance(target[key], dict):
-            return False
-        target = target[key]
-    if keys:
-        target[keys[-1]] = value
-        return True
-    return False
+    for key in keys:
+        target = target.get(key)
+        if not isinstance(target, dict):
+            return None
+    return target
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import logging
 import re
+from collections import OrderedDict
 
 import openai
 
+from src import jsonutil
 from src.storage.db import Storage
 
 logger = logging.getLogger(__name__)
@@ -28,16 +32,33 @@ INJECTION_PATTERNS: list[re.Pattern] = [
 ]
 
 
+_WORD_RE = re.compile(r"\w+")
+
+# All patterns fused into one alternation so the text is scanned in a single pass
+_COMBINED = re.compile(
+    "|".join(f"(?P<p{i}>{p.pattern})" for i, p in enumerate(INJECTION_PATTERNS)),
+    re.IGNORECASE,
+)
+
+
 def sanitize_content(text: str) -> tuple[str, list[str]]:
     """Scan text for injection patterns. Returns (cleaned_text, warnings)."""
-    warnings: list[str] = []
-    cleaned = text
-    for pattern in INJECTION_PATTERNS:
-        match = pattern.search(cleaned)
-        if match:
-            warnings.append(f"Injection pattern detected: '{match.group()}'")
-            cleaned = pattern.sub("[REDACTED]", cleaned)
-    return cleaned, warnings
+    first: dict[str, str] = {}
+    out: list[str] = []
+    last = 0
+    for match in _COMBINED.finditer(text):
+        first.setdefault(match.lastgroup, match.group())
+        out.append(text[last:match.start()])
+        out.append("[REDACTED]")
+        last = match.end()
+    if not first:
+        return text, []
+    out.append(text[last:])
+    warnings = [
+        f"Injection pattern detected: '{first[name]}'"
+        for name in sorted(first, key=lambda n: int(n[1:]))
+    ]
+    return "".join(out), warnings
 
 
 def spotlight_content(trusted: str, untrusted: str) -> str:
@@ -53,50 +74,108 @@ def spotlight_content(trusted: str, untrusted: str) -> str:
     )
 
 
-async def validate_action(
-    action: dict,
-    goals: dict,
-    constitution: dict,
-    client: openai.AsyncOpenAI,
-    model: str,
-) -> tuple[bool, str]:
-    """Task Shield: verify an action aligns with goals and constitution."""
-    safety_rules = constitution.get("safety", {}).get("rules", [])
-    mission = goals.get("mission", "")
-    objectives = goals.get("current_objectives", [])
+_ACTION_SHIELD_CACHE_SIZE = 256
+# Only actions that publish text are worth an LLM review; the rest pass
+_SHIELDED_ACTIONS = frozenset({"post", "comment"})
+
+
+# Outbound text is the agent's own, so the inbound injection phrases don't apply;
+# only the constitution's "never reveal API keys, tokens, or credentials" rule does
+_OUTBOUND_PATTERNS: list[re.Pattern] = [
+    re.compile(r"(?:api[_\s]?key|token|password|secret)\s*[:=]\s*['\"]?[\w\-.]{16,}", re.IGNORECASE),
+    re.compile(r"\bsk-[\w\-]{16,}"),
+]
+
 
-    action_desc = f"Action: {action.get('action', 'unknown')}"
+def _action_signature(action: dict) -> tuple:
+    """Identity of an action: its type plus a digest of its exact params."""
     params = action.get("params")
-    if params:
-        action_desc += f", Params: {params}"
-
-    prompt = (
-        "You are a safety validator for an AI agent. Evaluate whether the following action "
-        "aligns with the agent's goals and safety rules.\n\n"
-        f"Safety rules:\n" + "\n".join(f"- {r}" for r in safety_rules) + "\n\n"
-        f"Mission: {mission}\n"
-        f"Objectives: {', '.join(objectives)}\n\n"
-        f"{action_desc}\n\n"
-        "Reply ONLY with a JSON object: {\"safe\": true/false, \"reason\": \"...\"}"
-    )
-    try:
-        resp = await client.chat.completions.create(
-            model=model,
-            max_tokens=128,
-            messages=[{"role": "user", "content": prompt}],
-            _action="validate_action",
+    if isinstance(params, dict):
+        params = sorted(params.items())
+    return action.get("action", "unknown"), hashlib.sha256(repr(params).encode()).hexdigest()
+
+
+def _denylist_reason(action: dict) -> str | None:
+    """Cheap first tier: block actions whose text params look like leaked credentials."""
+    params = action.get("params")
+    values = params.values() if isinstance(params, dict) else (params,)
+    for value in values:
+        if isinstance(value, str):
+            for pattern in _OUTBOUND_PATTERNS:
+                match = pattern.search(value)
+                if match:
+                    return f"Blocked pattern in action params: '{match.group()}'"
+    return None
+
+
+class TaskShield:
+    """Task Shield: verify an action aligns with goals and constitution.
+
+    Params that look like leaked credentials are rejected without an LLM call,
+    actions that publish no text (skip, upvote) pass unreviewed, and approvals
+    are remembered per exact action, so only a verbatim repeat skips the model.
+    """
+
+    def __init__(self, constitution: dict, client: openai.AsyncOpenAI, model: str):
+        self._client = client
+        self._model = model
+        safety_rules = constitution.get("safety", {}).get("rules", [])
+        self._rules_block = "Safety rules:\n" + "\n".join(f"- {r}" for r in safety_rules) + "\n\n"
+        # (goals context, action signature) -> verdict; approvals only
+        self._cache: OrderedDict[tuple, tuple[bool, str]] = OrderedDict()
+
+    async def check(self, action: dict, goals: dict) -> tuple[bool, str]:
+        denied = _denylist_reason(action)
+        if denied:
+            return False, denied
+        if action.get("action") not in _SHIELDED_ACTIONS:
+            return True, ""
+
+        mission = goals.get("mission", "")
+        objectives = goals.get("current_objectives", [])
+        goals_block = f"Mission: {mission}\nObjectives: {', '.join(objectives)}\n\n"
+
+        key = (goals_block, _action_signature(action))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        action_desc = f"Action: {action.get('action', 'unknown')}"
+        params = action.get("params")
+        if params:
+            action_desc += f", Params: {params}"
+
+        prompt = (
+            "You are a safety validator for an AI agent. Evaluate whether the following action "
+            "aligns with the agent's goals and safety rules.\n\n"
+            f"{self._rules_block}"
+            f"{goals_block}"
+            f"{action_desc}\n\n"
+            "Reply ONLY with a JSON object: {\"safe\": true/false, \"reason\": \"...\"}"
         )
-        text = resp.choices[0].message.content.strip()
-        start = text.find("{")
-        end = text.rfind("}") + 1
-        if start != -1 and end > start:
-            import json
-            result = json.loads(text[start:end])
-            return result.get("safe", True), result.get("reason", "")
-        return True, "Could not parse validation response"
-    except Exception:
-        logger.warning("Action validation failed, allowing by default")
-        return True, "Validation error — defaulting to allow"
+        try:
+            resp = await self._client.chat.completions.create(
+                model=self._model,
+                max_tokens=128,
+                messages=[{"role": "user", "content": prompt}],
+                _action="validate_action",
+            )
+            text = resp.choices[0].message.content.strip()
+            start = text.find("{")
+            end = text.rfind("}") + 1
+            if start != -1 and end > start:
+                result = jsonutil.loads(text[start:end])
+                verdict = result.get("safe", True), result.get("reason", "")
+                if verdict[0]:
+                    self._cache[key] = verdict
+                    if len(self._cache) > _ACTION_SHIELD_CACHE_SIZE:
+                        self._cache.popitem(last=False)
+                return verdict
+            return True, "Could not parse validation response"
+        except Exception:
+            logger.warning("Action validation failed, allowing by default")
+            return True, "Validation error — defaulting to allow"
 
 
 class StabilityIndex:
@@ -160,11 +239,16 @@ def _compute_topic_consistency(contents: list[str]) -> float:
     """Measure keyword overlap between consecutive episodes."""
     if len(contents) < 2:
         return 1.0
+    token_sets = [_token_set(c) for c in contents]
     overlaps = []
-    for i in range(len(contents) - 1):
-        words_a = set(re.findall(r"\w+", contents[i].lower()))
-        words_b = set(re.findall(r"\w+", contents[i + 1].lower()))
+    for words_a, words_b in zip(token_sets, token_sets[1:]):
         if words_a and words_b:
             overlap = len(words_a & words_b) / max(len(words_a), len(words_b))
             overlaps.append(overlap)
     return sum(overlaps) / len(overlaps) if overlaps else 1.0
+
+
+@functools.lru_cache(maxsize=256)
+def _token_set(content: str) -> frozenset[str]:
+    """Lower-cased word set of an episode; episodes recur across heartbeats, so memoize."""
+    return frozenset(_WORD_RE.findall(content.lower()))
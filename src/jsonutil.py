@@ -0,0 +1,33 @@
+"""JSON helpers: orjson when installed, stdlib json otherwise."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def loads(raw: str | bytes) -> Any:
+    """Parse JSON text. Raises ValueError on malformed input."""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def dumps_bytes(obj: Any, *, indent: bool = False, default: Callable | None = None) -> bytes:
+    """Serialize to UTF-8 JSON bytes (2-space indent when ``indent`` is set)."""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj, indent=2 if indent else None, default=default, ensure_ascii=False,
+    ).encode()
+
+
+def dumps(obj: Any, *, indent: bool = False, default: Callable | None = None) -> str:
+    """Serialize to a JSON string (2-space indent when ``indent`` is set)."""
+    if orjson:
+        return dumps_bytes(obj, indent=indent, default=default).decode()
+    return json.dumps(obj, indent=2 if indent else None, default=default, ensure_ascii=False)
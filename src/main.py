@@ -7,6 +7,7 @@ from src.core.consolidation import ConsolidationEngine
 from src.core.memory import MemoryManager
 from src.core.persona import load_constitution
 from src.core.reflection import ReflectionEngine
+from src.core.safety import TaskShield
 from src.runtime.scheduler import create_scheduler
 from src.runtime.worker import run_worker
 from src.config import settings
@@ -23,6 +24,11 @@ logger = logging.getLogger(__name__)
 
 
 async def main() -> None:
+    # Tasks that finish without suspending skip the ready queue (Python 3.12+)
+    eager_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_factory is not None:
+        asyncio.get_running_loop().set_task_factory(eager_factory)
+
     storage = Storage()
     await storage.init()
 
@@ -46,6 +52,9 @@ async def main() -> None:
     # Constitution for safety checks
     constitution = load_constitution()
 
+    # Task Shield: safety prompt prefix is built once from the constitution
+    shield = TaskShield(constitution, client, settings.llm_model)
+
     # Reflection engine
     reflection = ReflectionEngine(storage, memory, client, settings.llm_model, constitution)
 
@@ -61,8 +70,9 @@ async def main() -> None:
             if me.description:
                 await storage.set_state("agent_description", me.description)
             posts = await moltbook.get_profile_posts(me.name)
-            for p in posts:
-                await storage.save_own_post(p)
+            async with storage.transaction():
+                for p in posts:
+                    await storage.save_own_post(p)
             logger.info("Synced %d posts from profile (%s)", len(posts), me.name)
         except Exception:
             logger.warning("Failed to sync own posts from profile", exc_info=True)
@@ -76,6 +86,7 @@ async def main() -> None:
         consolidation_engine=consolidation,
         client=client,
         model=settings.llm_model,
+        shield=shield,
     )
     if moltbook.registered:
         scheduler.start()
@@ -88,6 +99,7 @@ async def main() -> None:
         run_worker(
             storage, brain,
             moltbook=moltbook, memory=memory, reflection_engine=reflection,
+            shield=shield,
         )
     )
 
@@ -102,11 +114,16 @@ async def main() -> None:
         consumer_task.cancel()
         await worker_task
         await consumer_task
-        scheduler.shutdown(wait=False)
+        await scheduler.shutdown()
         await moltbook.close()
         await storage.close()
         logger.info("Shutdown complete")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:  # optional: libuv-backed loop where available
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -2,19 +2,65 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import random
+import re
 import time
 from typing import Literal
 
 import httpx
 
+from src import jsonutil
 from src.config import settings
-from src.moltbook.models import Agent, Comment, Post, RegisterResponse
+from src.moltbook.models import (
+    Agent, Comment, CommentListAdapter, Post, PostListAdapter, RegisterResponse,
+)
 
 logger = logging.getLogger(__name__)
 
 SortOrder = Literal["hot", "new", "top", "rising"]
 SearchType = Literal["posts", "comments", "all"]
 
+# Freshness for cacheable GETs by path prefix (seconds); other paths (DMs, /agents/me) are never cached
+_GET_TTL: tuple[tuple[str, float], ...] = (
+    ("/feed", 10.0),
+    ("/posts", 10.0),
+    ("/search", 30.0),
+    ("/agents/profile", 60.0),
+)
+_GET_CACHE_SIZE = 256
+
+_MAX_ATTEMPTS = 3
+_IDEMPOTENT = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def _cache_ttl(path: str, headers: httpx.Headers) -> float | None:
+    """Seconds a GET response stays fresh, or None if it must not be cached."""
+    ttl = next((t for prefix, t in _GET_TTL if path.startswith(prefix)), None)
+    if ttl is None:
+        return None
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control:
+        return None
+    match = _MAX_AGE_RE.search(cache_control)
+    return float(match.group(1)) if match else ttl
+
+
+def _retry_after(headers: httpx.Headers) -> float:
+    """Seconds from a Retry-After header; 60 if missing or given as an HTTP date."""
+    try:
+        return max(float(headers.get("Retry-After", "60")), 0.0)
+    except ValueError:
+        return 60.0
+
+
+def _json_body(body, headers: dict | None = None) -> dict:
+    """Request kwargs for a JSON body encoded with orjson rather than httpx's stdlib json."""
+    return {
+        "content": jsonutil.dumps_bytes(body),
+        "headers": {**(headers or {}), "Content-Type": "application/json"},
+    }
+
 
 class NameTakenError(Exception):
     def __init__(self, name: str) -> None:
@@ -26,42 +72,57 @@ class RateLimiter:
     """Tracks cooldowns to stay within Moltbook rate limits."""
 
     def __init__(self) -> None:
-        self._last_post: float = 0
-        self._last_comment: float = 0
+        # Guards the bookkeeping only; waiters sleep outside it and re-check
+        self._lock = asyncio.Lock()
+        self._last_post: float = float("-inf")
+        self._last_comment: float = float("-inf")
         self._comments_today: int = 0
-        self._comments_day_start: float = time.time()
-
-    def _reset_daily_if_needed(self) -> None:
-        now = time.time()
+        self._comments_day_start: float = time.monotonic()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-read cooldown/limit settings (bound once so the hot path skips settings lookups)."""
+        self._post_cooldown = settings.post_cooldown_sec
+        self._comment_cooldown = settings.comment_cooldown_sec
+        self._max_comments = settings.max_comments_per_day
+
+    def _reset_daily_if_needed(self, now: float | None = None) -> None:
+        if now is None:
+            now = time.monotonic()
         if now - self._comments_day_start >= 86400:
             self._comments_today = 0
             self._comments_day_start = now
 
     async def wait_for_post(self) -> None:
-        elapsed = time.time() - self._last_post
-        wait = settings.post_cooldown_sec - elapsed
-        if wait > 0:
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._post_cooldown - (now - self._last_post)
+                if wait <= 0:
+                    self._last_post = now
+                    return
             logger.info("Post cooldown: waiting %.0fs", wait)
             await asyncio.sleep(wait)
-        self._last_post = time.time()
 
     async def wait_for_comment(self) -> None:
-        self._reset_daily_if_needed()
-        if self._comments_today >= settings.max_comments_per_day:
-            raise RuntimeError("Daily comment limit reached")
-
-        elapsed = time.time() - self._last_comment
-        wait = settings.comment_cooldown_sec - elapsed
-        if wait > 0:
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._reset_daily_if_needed(now)
+                if self._comments_today >= self._max_comments:
+                    raise RuntimeError("Daily comment limit reached")
+                wait = self._comment_cooldown - (now - self._last_comment)
+                if wait <= 0:
+                    self._last_comment = now
+                    self._comments_today += 1
+                    return
             logger.info("Comment cooldown: waiting %.0fs", wait)
             await asyncio.sleep(wait)
-        self._last_comment = time.time()
-        self._comments_today += 1
 
     @property
     def comments_remaining(self) -> int:
         self._reset_daily_if_needed()
-        return settings.max_comments_per_day - self._comments_today
+        return self._max_comments - self._comments_today
 
 
 class MoltbookClient:
@@ -72,6 +133,9 @@ class MoltbookClient:
         self._base_url = base_url or settings.moltbook_base_url
         self.rate = RateLimiter()
         self._client: httpx.AsyncClient | None = None
+        # (path, params) -> (expires_at, body, etag); bodies kept raw so callers get fresh dicts
+        self._cache: dict[tuple, tuple[float, bytes, str | None]] = {}
+        self._inflight: dict[tuple, asyncio.Future] = {}
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
@@ -82,6 +146,12 @@ class MoltbookClient:
                 base_url=self._base_url,
                 headers=headers,
                 timeout=30.0,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=200,
+                    max_keepalive_connections=100,
+                    keepalive_expiry=30.0,
+                ),
             )
         return self._client
 
@@ -91,17 +161,77 @@ class MoltbookClient:
 
     async def _request(self, method: str, path: str, **kwargs) -> dict:
         """Make an API request and return the raw JSON (with success/message envelope)."""
-        client = await self._get_client()
-        resp = await client.request(method, path, **kwargs)
-        if resp.status_code == 429:
-            retry_after = int(resp.headers.get("Retry-After", "60"))
-            logger.warning("Rate limited, retrying after %ds", retry_after)
-            await asyncio.sleep(retry_after)
-            resp = await client.request(method, path, **kwargs)
+        if method != "GET":
+            resp = await self._send(method, path, **kwargs)
+            # Writes may change anything we have cached
+            self._cache.clear()
+            resp.raise_for_status()
+            if resp.status_code == 204 or not resp.content:
+                return {}
+            return jsonutil.loads(resp.content)
+
+        # Single-flight: concurrent identical GETs share one fetch
+        key = (path, tuple(sorted((kwargs.get("params") or {}).items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._get(key, path, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget_inflight(key, t))
+        # Shielded so one cancelled caller doesn't cancel the fetch for the others
+        body = await asyncio.shield(task)
+        return jsonutil.loads(body) if body else {}
+
+    def _forget_inflight(self, key: tuple, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved in case every waiter was cancelled
+
+    async def _get(self, key: tuple, path: str, **kwargs) -> bytes:
+        """GET through the TTL cache. Returns the raw body (b"" for 204)."""
+        entry = self._cache.get(key)
+        if entry:
+            expires_at, body, etag = entry
+            if time.monotonic() < expires_at:
+                return body
+            if etag:
+                kwargs["headers"] = {**kwargs.get("headers", {}), "If-None-Match": etag}
+
+        resp = await self._send("GET", path, **kwargs)
+        if resp.status_code == 304 and entry:
+            ttl = _cache_ttl(path, resp.headers) or 0.0
+            self._cache[key] = (time.monotonic() + ttl, entry[1], entry[2])
+            return entry[1]
         resp.raise_for_status()
         if resp.status_code == 204:
-            return {}
-        return resp.json()
+            return b""
+        ttl = _cache_ttl(path, resp.headers)
+        if ttl is not None:
+            self._cache.pop(key, None)
+            if len(self._cache) >= _GET_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (time.monotonic() + ttl, resp.content, resp.headers.get("ETag"))
+        return resp.content
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        client = await self._get_client()
+        if "json" in kwargs:
+            kwargs.update(_json_body(kwargs.pop("json"), kwargs.get("headers")))
+        for attempt in range(_MAX_ATTEMPTS):
+            resp = await client.request(method, path, **kwargs)
+            if attempt == _MAX_ATTEMPTS - 1:
+                break
+            if resp.status_code == 429:
+                base = _retry_after(resp.headers)
+                delay = base + random.uniform(0, base * 0.25)
+                logger.warning("Rate limited, retrying after %.0fs", delay)
+            elif resp.status_code >= 500 and method in _IDEMPOTENT:
+                delay = 0.5 * 2 ** attempt + random.uniform(0, 0.25)
+                logger.warning("%s %s returned %d, retrying in %.1fs", method, path, resp.status_code, delay)
+            else:
+                break
+            await asyncio.sleep(delay)
+        return resp
 
     @staticmethod
     def _extract(data: dict, key: str) -> dict | list:
@@ -110,6 +240,14 @@ class MoltbookClient:
             return data[key]
         return data
 
+    @staticmethod
+    def _unwrap_list(data: dict | list, key: str) -> list:
+        """Pull the item list out of {key: [...]}, {key: {key|items: [...]}} or {items: [...]}."""
+        items = data.get(key, data) if isinstance(data, dict) else data
+        if isinstance(items, dict):
+            items = items.get(key, items.get("items"))
+        return items if isinstance(items, list) else []
+
     # ── Key management ───────────────────────────────────────────
 
     @property
@@ -117,29 +255,35 @@ class MoltbookClient:
         return bool(self._api_key)
 
     async def set_api_key(self, key: str) -> None:
-        """Store a new API key and reset the httpx client so it picks up the new auth header."""
+        """Store a new API key, swapping the auth header in place so pooled connections survive."""
         self._api_key = key
-        await self.close()
+        self._cache.clear()
+        if self._client and not self._client.is_closed:
+            if key:
+                self._client.headers["Authorization"] = f"Bearer {key}"
+            else:
+                self._client.headers.pop("Authorization", None)
 
     # ── Registration ──────────────────────────────────────────────
 
     async def register(self, name: str, description: str) -> RegisterResponse:
-        async with httpx.AsyncClient(
-            base_url=self._base_url, timeout=30.0,
-        ) as client:
-            resp = await client.post(
-                "/agents/register",
-                json={"name": name, "description": description},
-            )
-            if resp.status_code == 409:
-                raise NameTakenError(name)
-            resp.raise_for_status()
-            data = resp.json()
-            logger.info("Register response: %s", data)
-            agent = self._extract(data, "agent")
-            if isinstance(agent, dict) and "agent" in agent:
-                agent = agent["agent"]
-            return RegisterResponse(**agent)
+        client = await self._get_client()
+        # Registration is unauthenticated — drop any inherited bearer header
+        request = client.build_request(
+            "POST", "/agents/register",
+            **_json_body({"name": name, "description": description}),
+        )
+        request.headers.pop("Authorization", None)
+        resp = await client.send(request)
+        if resp.status_code == 409:
+            raise NameTakenError(name)
+        resp.raise_for_status()
+        data = jsonutil.loads(resp.content)
+        logger.debug("Register response: %s", data)
+        agent = self._extract(data, "agent")
+        if isinstance(agent, dict) and "agent" in agent:
+            agent = agent["agent"]
+        return RegisterResponse(**agent)
 
     # ── Profile ───────────────────────────────────────────────────
 
@@ -161,7 +305,7 @@ class MoltbookClient:
             return []
         for p in items:
             p.setdefault("author", name)
-        return [Post(**p) for p in items]
+        return PostListAdapter.validate_python(items)
 
     async def update_profile(self, description: str) -> Agent:
         data = await self._request(
@@ -178,10 +322,8 @@ class MoltbookClient:
             "GET", "/feed",
             params={"sort": sort, "limit": limit},
         )
-        items = self._extract(data, "posts")
-        if not isinstance(items, list):
-            items = items.get("posts", items.get("items", [])) if isinstance(items, dict) else []
-        return [Post(**p) for p in items]
+        items = self._unwrap_list(data, "posts")
+        return PostListAdapter.validate_python(items)
 
     async def get_posts(
         self,
@@ -193,10 +335,8 @@ class MoltbookClient:
         if submolt:
             params["submolt"] = submolt
         data = await self._request("GET", "/posts", params=params)
-        items = self._extract(data, "posts")
-        if not isinstance(items, list):
-            items = items.get("posts", items.get("items", [])) if isinstance(items, dict) else []
-        return [Post(**p) for p in items]
+        items = self._unwrap_list(data, "posts")
+        return PostListAdapter.validate_python(items)
 
     async def create_post(self, submolt: str, title: str, content: str) -> Post:
         await self.rate.wait_for_post()
@@ -221,10 +361,8 @@ class MoltbookClient:
             "GET", f"/posts/{post_id}/comments",
             params={"sort": sort},
         )
-        items = self._extract(data, "comments")
-        if not isinstance(items, list):
-            items = items.get("comments", items.get("items", [])) if isinstance(items, dict) else []
-        return [Comment(**c) for c in items]
+        items = self._unwrap_list(data, "comments")
+        return CommentListAdapter.validate_python(items)
 
     async def create_comment(
         self,
@@ -262,9 +400,14 @@ class MoltbookClient:
         type: SearchType = "all",
         limit: int = 20,
     ) -> dict:
+        """Search posts/comments. Returns the raw response dict.
+
+        The query is case- and whitespace-normalised before sending, so repeated
+        lookups of the same phrase share one entry in the GET cache.
+        """
         data = await self._request(
             "GET", "/search",
-            params={"q": query, "type": type, "limit": limit},
+            params={"q": " ".join(query.lower().split()), "type": type, "limit": limit},
         )
         return data
 
@@ -283,6 +426,26 @@ class MoltbookClient:
         data = await self._request("GET", "/agents/dm/check")
         return data
 
+    async def dm_poll(self) -> tuple[dict, list[dict], list[dict]]:
+        """Check DM activity, then fetch requests and conversations concurrently.
+
+        Returns (check, requests, conversations). The lists are empty when there is
+        no activity; a failed list fetch is logged and degrades to [].
+        """
+        check = await self.dm_check()
+        if not check.get("has_activity", False):
+            return check, [], []
+        requests, conversations = await asyncio.gather(
+            self.dm_get_requests(), self.dm_get_conversations(), return_exceptions=True,
+        )
+        if isinstance(requests, Exception):
+            logger.warning("Failed to fetch DM requests: %s", requests)
+            requests = []
+        if isinstance(conversations, Exception):
+            logger.warning("Failed to fetch DM conversations: %s", conversations)
+            conversations = []
+        return check, requests, conversations
+
     async def dm_get_requests(self) -> list[dict]:
         data = await self._request("GET", "/agents/dm/requests")
         items = self._extract(data, "requests")
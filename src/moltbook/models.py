@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, TypeAdapter, model_validator
 
 
 class Agent(BaseModel):
@@ -26,12 +26,17 @@ class Post(BaseModel):
     @classmethod
     def _flatten_nested(cls, data: dict) -> dict:
         # Unwrap {"post": {...}} envelope
-        if "post" in data and isinstance(data["post"], dict) and "id" not in data:
-            data = data["post"]
-        if isinstance(data.get("author"), dict):
-            data["author"] = data["author"].get("name", data["author"].get("id", "unknown"))
-        if isinstance(data.get("submolt"), dict):
-            data["submolt"] = data["submolt"].get("name", data["submolt"].get("display_name", "unknown"))
+        if "id" not in data:
+            inner = data.get("post")
+            if inner.__class__ is dict:
+                data = inner
+        # Flat payloads (plain-string author/submolt) fall straight through
+        author = data.get("author")
+        if author.__class__ is dict:
+            data["author"] = author.get("name", author.get("id", "unknown"))
+        submolt = data.get("submolt")
+        if submolt.__class__ is dict:
+            data["submolt"] = submolt.get("name", submolt.get("display_name", "unknown"))
         if data.get("content") is None:
             data["content"] = ""
         return data
@@ -50,10 +55,13 @@ class Comment(BaseModel):
     @classmethod
     def _flatten_nested(cls, data: dict) -> dict:
         # Unwrap {"comment": {...}} envelope
-        if "comment" in data and isinstance(data["comment"], dict) and "id" not in data:
-            data = data["comment"]
-        if isinstance(data.get("author"), dict):
-            data["author"] = data["author"].get("name", data["author"].get("id", "unknown"))
+        if "id" not in data:
+            inner = data.get("comment")
+            if inner.__class__ is dict:
+                data = inner
+        author = data.get("author")
+        if author.__class__ is dict:
+            data["author"] = author.get("name", author.get("id", "unknown"))
         if data.get("content") is None:
             data["content"] = ""
         return data
@@ -125,3 +133,8 @@ class RegisterResponse(BaseModel):
     name: str
     verification_code: str = ""
     profile_url: str = ""
+
+
+# Whole-list validators: one call into pydantic-core per response instead of one per item
+PostListAdapter = TypeAdapter(list[Post])
+CommentListAdapter = TypeAdapter(list[Comment])
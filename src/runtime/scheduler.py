@@ -1,18 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
 import json
 import logging
 import random
 from datetime import datetime, timedelta, timezone
-
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from apscheduler.triggers.interval import IntervalTrigger
+from typing import Awaitable, Callable
 
 from src.core.brain import Brain
 from src.core.memory import MemoryManager
 from src.core.reflection import ReflectionEngine
-from src.core.safety import StabilityIndex, validate_action
+from src.core.safety import StabilityIndex, TaskShield
 from src.config import settings
 from src.moltbook.client import MoltbookClient
 from src.moltbook.models import Comment, Post
@@ -23,6 +22,57 @@ logger = logging.getLogger(__name__)
 HEARTBEAT_JOB_ID = "heartbeat"
 CONSOLIDATION_JOB_ID = "consolidation"
 NEWSPAPER_JOB_ID = "daily_newspaper"
+MAINTENANCE_JOB_ID = "db_maintenance"
+
+# Cap on concurrent DM message fetches, to stay clear of API rate limits
+_DM_FETCH_CONCURRENCY = 8
+
+# Only bounds the stored counter; the delay itself is capped by heartbeat_max_backoff
+_MAX_IDLE_STREAK = 16
+
+# Daily jobs due within this window count as already run today
+_SCHEDULE_MARGIN = timedelta(minutes=1)
+
+# Sort key for comments with no created_at (they go first)
+_MIN_DATETIME = datetime.min.replace(tzinfo=timezone.utc)
+
+
+class Scheduler:
+    """Periodic jobs run as plain asyncio tasks: sleep, run, repeat."""
+
+    def __init__(self) -> None:
+        self._jobs: list[tuple[str, Callable[[], Awaitable[None]]]] = []
+        self._tasks: list[asyncio.Task] = []
+
+    def add_job(
+        self,
+        name: str,
+        job: Callable[..., Awaitable[None]],
+        next_delay: Callable[[], Awaitable[float]],
+        **kwargs,
+    ) -> None:
+        """Register ``job(**kwargs)`` to run after every ``await next_delay()`` seconds."""
+
+        async def loop() -> None:
+            while True:
+                await asyncio.sleep(await next_delay())
+                try:
+                    await job(**kwargs)
+                except Exception:
+                    logger.exception("Scheduled job %s failed", name)
+
+        self._jobs.append((name, loop))
+
+    def start(self) -> None:
+        for name, loop in self._jobs:
+            self._tasks.append(asyncio.create_task(loop(), name=name))
+
+    async def shutdown(self) -> None:
+        """Cancel every job and wait for them to finish unwinding."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
 
 
 def create_scheduler(
@@ -34,58 +84,97 @@ def create_scheduler(
     consolidation_engine=None,
     client=None,
     model: str = "",
-) -> AsyncIOScheduler:
-    scheduler = AsyncIOScheduler()
+    shield: TaskShield | None = None,
+) -> Scheduler:
+    scheduler = Scheduler()
+    # Both jobs run on this event loop; consolidation yields while a heartbeat holds it
+    heartbeat_lock = asyncio.Lock()
+    if shield is None:
+        shield = TaskShield(brain.constitution, brain._client, brain._model)
+
+    async def heartbeat_delay() -> float:
+        return await _next_heartbeat_delay(storage)
 
-    initial_delay = random.randint(settings.heartbeat_min_sec, settings.heartbeat_max_sec)
     scheduler.add_job(
-        _heartbeat,
-        trigger=IntervalTrigger(seconds=initial_delay),
-        id=HEARTBEAT_JOB_ID,
-        kwargs={
-            "scheduler": scheduler,
-            "storage": storage,
-            "brain": brain,
-            "moltbook": moltbook,
-            "memory": memory,
-            "reflection": reflection,
-        },
+        HEARTBEAT_JOB_ID, _heartbeat, heartbeat_delay,
+        storage=storage,
+        brain=brain,
+        moltbook=moltbook,
+        memory=memory,
+        reflection=reflection,
+        shield=shield,
+        stability_index=StabilityIndex(storage),
+        heartbeat_lock=heartbeat_lock,
     )
-    logger.info("Scheduler created (first heartbeat in %ds)", initial_delay)
+    logger.info("Scheduler created")
 
     # Consolidation job
     if consolidation_engine:
+        async def consolidation_delay() -> float:
+            return settings.consolidation_interval_min * 60
+
         scheduler.add_job(
-            _consolidation_tick,
-            trigger=IntervalTrigger(minutes=settings.consolidation_interval_min),
-            id=CONSOLIDATION_JOB_ID,
-            kwargs={
-                "storage": storage,
-                "consolidation_engine": consolidation_engine,
-            },
+            CONSOLIDATION_JOB_ID, _consolidation_tick, consolidation_delay,
+            storage=storage,
+            consolidation_engine=consolidation_engine,
+            heartbeat_lock=heartbeat_lock,
         )
         logger.info("Consolidation job scheduled (every %d min)", settings.consolidation_interval_min)
 
     # Daily newspaper job
     if client:
+        async def newspaper_delay() -> float:
+            return _seconds_until_hour(settings.daily_newspaper_hour)
+
         scheduler.add_job(
-            _daily_newspaper,
-            trigger=CronTrigger(hour=settings.daily_newspaper_hour),
-            id=NEWSPAPER_JOB_ID,
-            kwargs={
-                "storage": storage,
-                "client": client,
-                "model": model,
-            },
+            NEWSPAPER_JOB_ID, _daily_newspaper, newspaper_delay,
+            storage=storage,
+            client=client,
+            model=model,
         )
         logger.info("Daily newspaper scheduled at %02d:00 UTC", settings.daily_newspaper_hour)
 
+    # Daily database maintenance, at a fixed hour so frequent restarts don't postpone it forever
+    async def maintenance_delay() -> float:
+        return _seconds_until_hour(settings.db_maintenance_hour)
+
+    scheduler.add_job(MAINTENANCE_JOB_ID, _db_maintenance, maintenance_delay, storage=storage)
+    logger.info("Database maintenance scheduled at %02d:00 UTC", settings.db_maintenance_hour)
+
     return scheduler
 
 
-def _build_thread_context(target: Comment, all_comments: list[Comment]) -> list[Comment]:
+async def _next_heartbeat_delay(storage: Storage) -> int:
+    """Random interval for the next heartbeat, stretched while the agent is idle."""
+    try:
+        idle_streak = int(await storage.get_state("idle_streak") or 0)
+    except Exception:
+        logger.exception("Failed to read idle streak")
+        idle_streak = 0
+    # Double the interval per idle heartbeat, up to heartbeat_max_backoff (>= 1)
+    backoff = min(2 ** idle_streak, settings.heartbeat_max_backoff)
+    next_delay = random.randint(settings.heartbeat_min_sec, settings.heartbeat_max_sec) * backoff
+    logger.info("Next heartbeat in %ds", next_delay)
+    return next_delay
+
+
+def _seconds_until_hour(hour: int) -> float:
+    """Seconds from now until the next ``hour``:00 UTC."""
+    now = datetime.now(timezone.utc)
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    # The sleep runs on the monotonic clock and can wake just short of the wall-clock
+    # target; without the margin a quick job would be rescheduled for moments later
+    if target <= now + _SCHEDULE_MARGIN:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def _build_thread_context(
+    target: Comment, all_comments: list[Comment], by_id: dict[str, Comment] | None = None,
+) -> list[Comment]:
     """Walk parent_id chain to build conversation thread leading to target."""
-    by_id = {c.id: c for c in all_comments}
+    if by_id is None:
+        by_id = {c.id: c for c in all_comments}
     thread: list[Comment] = []
     current = target
     while current.parent_id and current.parent_id in by_id:
@@ -96,36 +185,87 @@ def _build_thread_context(target: Comment, all_comments: list[Comment]) -> list[
     return thread
 
 
+def _classify_comments(
+    comments: list[Comment], unseen_ids: set[str], agent_name_lc: str,
+) -> tuple[list[tuple[Comment, list[Comment]]], list[tuple[str, bool]]]:
+    """Split a post's comments into reply-eligible ones (with thread context)
+    and ``(comment_id, replied)`` rows to mark seen without replying."""
+    by_id = {c.id: c for c in comments}
+    eligible: list[tuple[Comment, list[Comment]]] = []
+    to_mark: list[tuple[str, bool]] = []
+
+    for comment in comments:
+        # Skip own comments
+        if comment.author.lower() == agent_name_lc:
+            if comment.id in unseen_ids:
+                to_mark.append((comment.id, True))
+            continue
+
+        if comment.id not in unseen_ids:
+            continue
+
+        # Queue reply for: top-level comments or direct replies to our comments
+        is_top_level = not comment.parent_id
+        is_reply_to_us = False
+        if comment.parent_id:
+            parent = by_id.get(comment.parent_id)
+            if parent and parent.author.lower() == agent_name_lc:
+                is_reply_to_us = True
+
+        if is_top_level or is_reply_to_us:
+            # Don't mark seen yet — defer until actually replied
+            eligible.append((comment, _build_thread_context(comment, comments, by_id)))
+        else:
+            # Not reply-eligible — mark seen and move on
+            to_mark.append((comment.id, False))
+
+    return eligible, to_mark
+
+
 async def _check_own_post_replies(
     storage: Storage,
     brain: Brain,
     moltbook: MoltbookClient,
     memory: MemoryManager | None = None,
     max_replies: int = 2,
+    agent_name: str | None = None,
 ) -> int:
     """Check for new comments on own posts and reply. Returns number of replies sent."""
-    agent_name = await storage.get_state("agent_name")
+    if agent_name is None:
+        agent_name = await storage.get_state("agent_name")
     if not agent_name:
         return 0
+    agent_name_lc = agent_name.lower()
 
     cutoff = (datetime.now(timezone.utc) - timedelta(hours=48)).isoformat()
-    own_posts = await storage.get_own_posts(limit=10)
-    recent_posts = [p for p in own_posts if (p.get("created_at") or "") >= cutoff]
+    recent_posts = await storage.get_own_posts(limit=10, since_iso=cutoff)
 
     if not recent_posts:
         return 0
 
     pending_replies: list[tuple[Post, Comment, list[Comment]]] = []
+    to_mark: list[tuple[str, str, bool]] = []
+
+    comments_lists = await asyncio.gather(
+        *(moltbook.get_comments(p["id"], sort="new") for p in recent_posts),
+        return_exceptions=True,
+    )
+
+    # comment_id is unique across posts, so one lookup covers every fetched list
+    unseen_ids = await storage.filter_unseen_comments([
+        c.id for comments in comments_lists if not isinstance(comments, Exception) for c in comments
+    ])
 
-    for post_row in recent_posts:
+    for post_row, comments in zip(recent_posts, comments_lists):
         post_id = post_row["id"]
-        try:
-            comments = await moltbook.get_comments(post_id, sort="new")
-        except Exception:
+        if isinstance(comments, Exception):
             logger.warning("Failed to fetch comments for post %s", post_id)
             continue
 
-        seen_ids = await storage.get_seen_comment_ids(post_id)
+        eligible, seen_now = _classify_comments(comments, unseen_ids, agent_name_lc)
+        to_mark.extend((comment_id, post_id, replied) for comment_id, replied in seen_now)
+        if not eligible:
+            continue
 
         # Build a Post object for brain
         post = Post(
@@ -135,38 +275,18 @@ async def _check_own_post_replies(
             title=post_row.get("title", ""),
             content=post_row.get("content", ""),
         )
+        pending_replies.extend((post, comment, thread_ctx) for comment, thread_ctx in eligible)
 
-        for comment in comments:
-            # Skip own comments
-            if comment.author.lower() == agent_name.lower():
-                if comment.id not in seen_ids:
-                    await storage.mark_comment_seen(comment.id, post_id, replied=True)
-                continue
-
-            if comment.id in seen_ids:
-                continue
-
-            # Queue reply for: top-level comments or direct replies to our comments
-            is_top_level = not comment.parent_id
-            is_reply_to_us = False
-            if comment.parent_id:
-                parent = next((c for c in comments if c.id == comment.parent_id), None)
-                if parent and parent.author.lower() == agent_name.lower():
-                    is_reply_to_us = True
-
-            if is_top_level or is_reply_to_us:
-                # Don't mark seen yet — defer until actually replied
-                thread_ctx = _build_thread_context(comment, comments)
-                pending_replies.append((post, comment, thread_ctx))
-            else:
-                # Not reply-eligible — mark seen and move on
-                await storage.mark_comment_seen(comment.id, post_id, replied=False)
+    await storage.mark_comments_seen_many(to_mark)
 
     # Process replies FIFO (oldest first), capped at max_replies
-    pending_replies.sort(key=lambda x: x[1].created_at or datetime.min.replace(tzinfo=timezone.utc))
+    oldest = heapq.nsmallest(
+        max_replies, pending_replies,
+        key=lambda x: x[1].created_at or _MIN_DATETIME,
+    )
     replies_sent = 0
 
-    for post, comment, thread_ctx in pending_replies[:max_replies]:
+    for post, comment, thread_ctx in oldest:
         try:
             text = await brain.generate_reply(post, comment, thread_ctx)
             if not text:
@@ -224,52 +344,46 @@ async def _check_dms(
     brain: Brain,
     moltbook: MoltbookClient,
     memory: MemoryManager | None = None,
-) -> None:
-    """Check DMs: auto-approve requests, reply to new messages."""
+    agent_name: str | None = None,
+) -> bool:
+    """Check DMs: auto-approve requests, reply to new messages. Returns whether there was activity."""
     try:
-        check = await moltbook.dm_check()
+        check, requests, conversations = await moltbook.dm_poll()
     except Exception:
         logger.warning("DM check failed (endpoint may not exist yet)")
-        return
+        return False
 
     has_activity = check.get("has_activity", False)
     if not has_activity:
         logger.debug("DM check: no activity")
-        return
+        return False
 
-    agent_name = await storage.get_state("agent_name") or ""
+    if agent_name is None:
+        agent_name = await storage.get_state("agent_name")
+    agent_name_lc = (agent_name or "").lower()
 
     # Auto-approve pending requests
-    try:
-        requests = await moltbook.dm_get_requests()
-        for req in requests:
-            conv_id = req.get("conversation_id") or req.get("id", "")
-            from_agent = req.get("from", {})
-            if isinstance(from_agent, dict):
-                from_name = from_agent.get("name", "unknown")
-            else:
-                from_name = str(from_agent)
-
-            try:
-                await moltbook.dm_approve(conv_id)
-                await storage.upsert_dm_conversation(conv_id, from_name)
-                logger.info("Auto-approved DM request from %s", from_name)
-                await storage.audit("dm_approved", {
-                    "conversation_id": conv_id, "other_agent": from_name,
-                })
-                await storage.emit_event("dm_approved", {"other_agent": from_name})
-            except Exception:
-                logger.exception("Failed to approve DM from %s", from_name)
-    except Exception:
-        logger.warning("Failed to fetch DM requests")
+    for req in requests:
+        conv_id = req.get("conversation_id") or req.get("id", "")
+        from_agent = req.get("from", {})
+        if isinstance(from_agent, dict):
+            from_name = from_agent.get("name", "unknown")
+        else:
+            from_name = str(from_agent)
 
-    # Process conversations with unread messages
-    try:
-        conversations = await moltbook.dm_get_conversations()
-    except Exception:
-        logger.warning("Failed to fetch DM conversations")
-        return
+        try:
+            await moltbook.dm_approve(conv_id)
+            await storage.upsert_dm_conversation(conv_id, from_name)
+            logger.info("Auto-approved DM request from %s", from_name)
+            await storage.audit("dm_approved", {
+                "conversation_id": conv_id, "other_agent": from_name,
+            })
+            await storage.emit_event("dm_approved", {"other_agent": from_name})
+        except Exception:
+            logger.exception("Failed to approve DM from %s", from_name)
 
+    # Register unread conversations and drop those flagged for a human
+    unread_convs: list[tuple[str, str, int, dict | None]] = []
     for conv in conversations:
         conv_id = conv.get("conversation_id") or conv.get("id", "")
         unread = conv.get("unread_count", 0)
@@ -293,10 +407,21 @@ async def _check_dms(
             })
             continue
 
-        # Fetch messages
-        try:
-            messages = await moltbook.dm_get_messages(conv_id)
-        except Exception:
+        unread_convs.append((conv_id, other_name, unread, db_conv))
+
+    # Fetch messages for all of them at once; replies below stay serial
+    sem = asyncio.Semaphore(_DM_FETCH_CONCURRENCY)
+
+    async def fetch(conv_id: str) -> list[dict]:
+        async with sem:
+            return await moltbook.dm_get_messages(conv_id)
+
+    results = await asyncio.gather(
+        *(fetch(conv_id) for conv_id, *_ in unread_convs), return_exceptions=True,
+    )
+
+    for (conv_id, other_name, unread, db_conv), messages in zip(unread_convs, results):
+        if isinstance(messages, Exception):
             logger.warning("Failed to fetch messages for DM %s", conv_id)
             continue
 
@@ -305,21 +430,19 @@ async def _check_dms(
 
         # Find new messages (after last_seen watermark)
         last_seen_id = (db_conv or {}).get("last_seen_message_id")
+        new_messages = messages
         if last_seen_id:
-            found_watermark = False
-            new_messages = []
-            for msg in messages:
-                if found_watermark:
-                    new_messages.append(msg)
-                elif msg.get("id") == last_seen_id:
-                    found_watermark = True
-            if not found_watermark:
-                new_messages = messages
-        else:
-            new_messages = messages
+            # Search from the newest end: the watermark is usually near the tail
+            for i in range(len(messages) - 1, -1, -1):
+                if messages[i].get("id") == last_seen_id:
+                    new_messages = messages[i + 1:]
+                    break
 
         # Skip if no new messages from others
-        incoming = [m for m in new_messages if m.get("sender", {}).get("name", m.get("sender", "")) != agent_name]
+        incoming = [
+            m for m in new_messages
+            if m.get("sender", {}).get("name", m.get("sender", "")).lower() != agent_name_lc
+        ]
         if not incoming:
             # Update watermark anyway
             if messages:
@@ -381,155 +504,170 @@ async def _check_dms(
         if messages:
             await storage.update_dm_last_seen(conv_id, messages[-1].get("id", ""))
 
+    return True
+
 
 async def _heartbeat(
-    scheduler: AsyncIOScheduler,
     storage: Storage,
     brain: Brain,
     moltbook: MoltbookClient,
     memory: MemoryManager | None = None,
     reflection: ReflectionEngine | None = None,
+    shield: TaskShield | None = None,
+    stability_index: StabilityIndex | None = None,
+    heartbeat_lock: asyncio.Lock | None = None,
 ) -> None:
-    # Reschedule with new random interval for next run
-    next_delay = random.randint(settings.heartbeat_min_sec, settings.heartbeat_max_sec)
-    scheduler.reschedule_job(HEARTBEAT_JOB_ID, trigger=IntervalTrigger(seconds=next_delay))
-    logger.info("Next heartbeat in %ds", next_delay)
-
     if not moltbook.registered:
         logger.info("Heartbeat skipped (not registered)")
         await storage.emit_event("heartbeat_skip", {"reason": "not registered"})
         return
 
-    paused = await storage.get_state("paused")
-    if paused == "1":
+    if await storage.is_paused():
         logger.info("Heartbeat skipped (paused)")
         await storage.emit_event("heartbeat_skip", {"reason": "paused"})
         return
 
-    # Set heartbeat lock
-    await storage.set_state("heartbeat_running", "1")
+    # Read once and hand to the phase helpers below
+    agent_name = await storage.get_state("agent_name")
 
-    try:
-        # Increment heartbeat counter
-        hb_count = await storage.get_state("heartbeat_count")
-        count = int(hb_count) + 1 if hb_count else 1
-        await storage.set_state("heartbeat_count", str(count))
+    # Set heartbeat lock
+    if heartbeat_lock is None:
+        heartbeat_lock = asyncio.Lock()
+    async with heartbeat_lock:
+        # The feed doesn't depend on the obligations phase, so fetch it meanwhile
+        feed_task = asyncio.create_task(moltbook.get_feed(sort="new", limit=15))
 
-        # Phase 1: Obligations — reply to comments on own posts, check DMs
         try:
-            replies_sent = await _check_own_post_replies(
-                storage, brain, moltbook, memory
-            )
-        except Exception:
-            logger.exception("_check_own_post_replies failed")
-            replies_sent = 0
+            # Increment heartbeat counter
+            hb_count = await storage.get_state("heartbeat_count")
+            count = int(hb_count) + 1 if hb_count else 1
+            await storage.set_state("heartbeat_count", str(count))
 
-        try:
-            await _check_dms(storage, brain, moltbook, memory)
-        except Exception:
-            logger.exception("_check_dms failed")
-
-        # Phase 2: Autonomous action
-        stats = await storage.get_stats()
-        feed = await moltbook.get_feed(sort="new", limit=15)
-
-        for post in feed:
-            await storage.mark_seen(post.id)
-
-        decision = await brain.decide_action(feed, stats)
-        action = decision.get("action", "skip")
-        params = decision.get("params") or {}
-
-        await storage.audit("decision", {
-            "stats": stats,
-            "action": action,
-            "params": params,
-            "feed_snapshot": [
-                {"id": p.id, "title": p.title, "author": p.author}
-                for p in feed[:15]
-            ],
-        })
+            # Phase 1: Obligations — reply to comments on own posts, check DMs
+            try:
+                replies_sent = await _check_own_post_replies(
+                    storage, brain, moltbook, memory, agent_name=agent_name
+                )
+            except Exception:
+                logger.exception("_check_own_post_replies failed")
+                replies_sent = 0
 
-        logger.info("Heartbeat decision: %s %s", action, params)
+            try:
+                dm_activity = await _check_dms(storage, brain, moltbook, memory, agent_name=agent_name)
+            except Exception:
+                logger.exception("_check_dms failed")
+                dm_activity = False
+
+            # Phase 2: Autonomous action
+            stats = await storage.get_stats()
+            feed = await feed_task
+            feed_by_id = {p.id: p for p in feed}
+
+            await storage.mark_seen_many([post.id for post in feed])
+
+            decision = await brain.decide_action(feed, stats)
+            action = decision.get("action", "skip")
+            params = decision.get("params") or {}
+
+            await storage.audit("decision", {
+                "stats": stats,
+                "action": action,
+                "params": params,
+                "feed_snapshot": [
+                    {"id": p.id, "title": p.title, "author": p.author}
+                    for p in feed[:15]
+                ],
+            })
 
-        # Task Shield: validate action against goals
-        constitution = brain.identity.get("constitution", {})
-        strategy = brain.identity.get("strategy", {})
-        goals = strategy.get("goals", {})
+            logger.info("Heartbeat decision: %s %s", action, params)
 
-        safe, reason = await validate_action(
-            decision, goals, constitution, brain._client, brain._model
-        )
-        if not safe:
-            logger.warning("Action blocked by Task Shield: %s", reason)
-            await storage.audit("skip", {
-                "reason": f"safety_block: {reason}", "blocked_action": action,
-            })
-            if memory:
-                await memory.remember(
-                    "safety_block",
-                    f"Action '{action}' blocked: {reason}",
-                    metadata={"action": action, "reason": reason},
-                )
-            action = "skip"
-
-        # Execute action
-        if action == "post":
-            await _do_post(storage, brain, moltbook, feed, memory)
-        elif action == "comment":
-            await _do_comment(storage, brain, moltbook, feed, params, memory)
-        elif action == "upvote":
-            post_id = params.get("post_id")
-            if post_id:
-                await moltbook.upvote_post(post_id)
-                logger.info("Upvoted post %s", post_id)
-                target = next((p for p in feed if p.id == post_id), None)
-                await storage.audit("upvote_post", {
-                    "post_id": post_id,
-                    "post_title": target.title if target else "",
-                    "post_author": target.author if target else "",
-                })
-                await storage.emit_event("upvoted", {
-                    "post_id": post_id,
-                    "post_title": target.title if target else "",
-                    "post_author": target.author if target else "",
+            # Task Shield: validate action against goals
+            safe, reason = await shield.check(decision, brain.goals)
+            if not safe:
+                logger.warning("Action blocked by Task Shield: %s", reason)
+                await storage.audit("skip", {
+                    "reason": f"safety_block: {reason}", "blocked_action": action,
                 })
                 if memory:
-                    await memory.remember("upvote", f"Upvoted post {post_id}")
-        else:
-            logger.info("Heartbeat: skip")
-            if memory:
-                await memory.remember("skip", "Skipped this heartbeat cycle", metadata={"count": count})
-
-        # Stability Index check
-        asi = StabilityIndex(storage)
-        stability = await asi.compute()
-        if stability.get("alert"):
-            logger.warning("Stability alert! ASI=%.3f %s", stability["overall"], stability["components"])
-            await storage.emit_event("stability_alert", {
-                "overall": stability["overall"],
-                "components": stability["components"],
-            })
-
-        # Reflection trigger
-        if reflection:
-            should, trigger_reason = await reflection.should_trigger()
-            if should:
-                logger.info("Reflection triggered: %s", trigger_reason)
-                result = await reflection.run_reflection_cycle()
-                if result.get("changes"):
-                    new_strategy = await storage.get_strategy()
-                    brain.reload_prompt(strategy=new_strategy)
-                    await storage.emit_event("reflection_done", {
-                        "accepted": result.get("accepted", 0),
-                        "rejected": result.get("rejected", 0),
-                        "changes": result["changes"],
+                    await memory.remember(
+                        "safety_block",
+                        f"Action '{action}' blocked: {reason}",
+                        metadata={"action": action, "reason": reason},
+                    )
+                action = "skip"
+
+            # Execute action
+            if action == "post":
+                await _do_post(storage, brain, moltbook, feed, memory)
+            elif action == "comment":
+                await _do_comment(storage, brain, moltbook, feed_by_id, params, memory)
+            elif action == "upvote":
+                post_id = params.get("post_id")
+                if post_id:
+                    await moltbook.upvote_post(post_id)
+                    logger.info("Upvoted post %s", post_id)
+                    target = feed_by_id.get(post_id)
+                    await storage.audit("upvote_post", {
+                        "post_id": post_id,
+                        "post_title": target.title if target else "",
+                        "post_author": target.author if target else "",
                     })
+                    await storage.emit_event("upvoted", {
+                        "post_id": post_id,
+                        "post_title": target.title if target else "",
+                        "post_author": target.author if target else "",
+                    })
+                    if memory:
+                        await memory.remember("upvote", f"Upvoted post {post_id}")
+            else:
+                logger.info("Heartbeat: skip")
+                if memory:
+                    await memory.remember("skip", "Skipped this heartbeat cycle", metadata={"count": count})
 
-    except Exception:
-        logger.exception("Heartbeat failed")
-    finally:
-        await storage.set_state("heartbeat_running", "0")
+            # Back off the next heartbeats while nothing is happening
+            if replies_sent or dm_activity or action != "skip":
+                idle_streak = 0
+            else:
+                idle_streak = int(await storage.get_state("idle_streak") or 0)
+                idle_streak = min(idle_streak + 1, _MAX_IDLE_STREAK)
+            await storage.set_state("idle_streak", str(idle_streak))
+
+            # Stability Index check
+            if stability_index is None:
+                stability_index = StabilityIndex(storage)
+            stability = await stability_index.compute()
+            if stability.get("alert"):
+                logger.warning("Stability alert! ASI=%.3f %s", stability["overall"], stability["components"])
+                await storage.emit_event("stability_alert", {
+                    "overall": stability["overall"],
+                    "components": stability["components"],
+                })
+
+            # Reflection trigger
+            if reflection:
+                should, trigger_reason = await reflection.should_trigger(count)
+                if should:
+                    # Hand the LLM-heavy cycle to the worker so the heartbeat isn't held up
+                    pending = await storage.get_pending_tasks()
+                    if any(t["type"] == "reflect" for t in pending):
+                        logger.info("Reflection triggered (%s), already queued", trigger_reason)
+                    else:
+                        task_id = await storage.add_task(
+                            "reflect", {"source": "scheduler", "trigger": trigger_reason},
+                        )
+                        logger.info("Reflection triggered: %s (task #%d)", trigger_reason, task_id)
+
+            # Quiet cycle: a good moment to keep the WAL from growing unbounded
+            if idle_streak:
+                await storage.checkpoint()
+
+        except Exception:
+            logger.exception("Heartbeat failed")
+        finally:
+            if not feed_task.done():
+                feed_task.cancel()
+            elif not feed_task.cancelled():
+                feed_task.exception()  # retrieve, so an unawaited failure isn't reported twice
 
 
 async def _do_post(
@@ -553,15 +691,16 @@ async def _do_post(
         title=post_data["title"],
         content=post_data["content"],
     )
-    await storage.save_own_post(post)
-    await storage.add_digest_item("post", {"id": post.id, "title": post.title, "submolt": post.submolt})
+    # One commit for the post's bookkeeping rows
+    async with storage.transaction():
+        await storage.save_own_post(post)
+        await storage.add_digest_item("post", {"id": post.id, "title": post.title, "submolt": post.submolt})
+        await storage.audit("post", {
+            "submolt": post.submolt, "title": post.title,
+            "content": post.content, "post_id": post.id,
+        })
     logger.info("Created post: %s (id=%s)", post.title, post.id)
 
-    await storage.audit("post", {
-        "submolt": post.submolt, "title": post.title,
-        "content": post.content, "post_id": post.id,
-    })
-
     if memory:
         await memory.remember(
             "post",
@@ -579,7 +718,7 @@ async def _do_comment(
     storage: Storage,
     brain: Brain,
     moltbook: MoltbookClient,
-    feed: list,
+    feed_by_id: dict[str, Post],
     params: dict,
     memory: MemoryManager | None = None,
 ) -> None:
@@ -588,11 +727,7 @@ async def _do_comment(
         logger.warning("comment action without post_id")
         return
 
-    target = None
-    for p in feed:
-        if p.id == post_id:
-            target = p
-            break
+    target = feed_by_id.get(post_id)
 
     if not target:
         logger.warning("Post %s not found in feed", post_id)
@@ -605,14 +740,14 @@ async def _do_comment(
         return
 
     comment = await moltbook.create_comment(post_id, text)
-    await storage.save_own_comment(comment)
-    await storage.add_digest_item("comment", {"post_id": post_id, "post_title": target.title, "content": text[:100]})
-    await storage.mark_seen(post_id, interacted=True)
-
-    await storage.audit("comment", {
-        "post_id": post_id, "post_title": target.title,
-        "post_author": target.author, "comment_text": text,
-    })
+    async with storage.transaction():
+        await storage.save_own_comment(comment)
+        await storage.add_digest_item("comment", {"post_id": post_id, "post_title": target.title, "content": text[:100]})
+        await storage.mark_seen(post_id, interacted=True)
+        await storage.audit("comment", {
+            "post_id": post_id, "post_title": target.title,
+            "post_author": target.author, "comment_text": text,
+        })
 
     try:
         await moltbook.upvote_post(post_id)
@@ -641,14 +776,13 @@ async def _do_comment(
 async def _consolidation_tick(
     storage: Storage,
     consolidation_engine,
+    heartbeat_lock: asyncio.Lock | None = None,
 ) -> None:
     """Run consolidation if not paused and heartbeat isn't running."""
-    paused = await storage.get_state("paused")
-    if paused == "1":
+    if await storage.is_paused():
         return
 
-    hb_running = await storage.get_state("heartbeat_running")
-    if hb_running == "1":
+    if heartbeat_lock is not None and heartbeat_lock.locked():
         logger.info("Consolidation skipped (heartbeat running)")
         return
 
@@ -665,6 +799,15 @@ async def _consolidation_tick(
         logger.exception("LLM usage compaction failed")
 
 
+async def _db_maintenance(storage: Storage) -> None:
+    """Reclaim free pages and refresh query planner statistics."""
+    try:
+        await storage.maintenance()
+        logger.info("Database maintenance done")
+    except Exception:
+        logger.exception("Database maintenance failed")
+
+
 async def _daily_newspaper(
     storage: Storage,
     client,
@@ -672,15 +815,13 @@ async def _daily_newspaper(
 ) -> None:
     """Generate and emit a daily newspaper summary of agent activity."""
     try:
-        entries = await storage.get_audit_since(24)
-        if not entries:
-            logger.info("Daily newspaper: nothing to report")
-            return
-
-        # Group entries by type
+        # Group entries by type as they stream in
         groups: dict[str, list[dict]] = {}
-        for e in entries:
+        async for e in storage.iter_audit_since(24):
             groups.setdefault(e["type"], []).append(e)
+        if not groups:
+            logger.info("Daily newspaper: nothing to report")
+            return
 
         # Build structured summary for LLM
         sections: list[str] = []
@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 
 from src.core.brain import Brain
 from src.core.memory import MemoryManager
-from src.core.safety import validate_action
+from src.core.safety import TaskShield
 from src.config import settings
 from src.moltbook.client import MoltbookClient
 from src.storage.db import Storage
@@ -20,9 +20,12 @@ async def run_worker(
     moltbook: MoltbookClient | None = None,
     memory: MemoryManager | None = None,
     reflection_engine=None,
+    shield: TaskShield | None = None,
     poll_interval: int = 5,
 ) -> None:
     """Async loop that processes pending tasks from the SQLite queue."""
+    if shield is None:
+        shield = TaskShield(brain.constitution, brain._client, brain._model)
     logger.info("Worker started (poll every %ds)", poll_interval)
     try:
         while True:
@@ -46,18 +49,20 @@ async def run_worker(
                             if result.get("changes"):
                                 new_strategy = await storage.get_strategy()
                                 brain.reload_prompt(strategy=new_strategy)
-                            await storage.emit_event("reflection_done", {
-                                "accepted": result.get("accepted", 0),
-                                "rejected": result.get("rejected", 0),
-                                "changes": result.get("changes", []),
-                            })
+                            # Scheduled cycles only notify when something changed
+                            if result.get("changes") or payload.get("source") != "scheduler":
+                                await storage.emit_event("reflection_done", {
+                                    "accepted": result.get("accepted", 0),
+                                    "rejected": result.get("rejected", 0),
+                                    "changes": result.get("changes", []),
+                                })
                             await storage.complete_task(task_id, result)
                         else:
                             await storage.fail_task(task_id, "Reflection engine not initialized")
                     elif task_type == "heartbeat":
                         if moltbook and moltbook.registered:
                             result = await _manual_heartbeat(
-                                storage, brain, moltbook, memory
+                                storage, brain, moltbook, memory, shield
                             )
                             await storage.complete_task(task_id, result)
                         else:
@@ -113,13 +118,13 @@ async def _manual_heartbeat(
     brain: Brain,
     moltbook: MoltbookClient,
     memory: MemoryManager | None,
+    shield: TaskShield,
 ) -> dict:
     """Execute a manual heartbeat with rate limit checks and detailed report."""
     stats = await storage.get_stats()
     feed = await moltbook.get_feed(sort="new", limit=15)
 
-    for post in feed:
-        await storage.mark_seen(post.id)
+    await storage.mark_seen_many([post.id for post in feed])
 
     # Build feed summary for report
     feed_lines = [
@@ -152,11 +157,8 @@ async def _manual_heartbeat(
         return {"action": "skip", "reason": limit_err}
 
     # Task Shield
-    constitution = brain.identity.get("constitution", {})
-    goals = brain.identity.get("strategy", {}).get("goals", {})
-    safe, reason = await validate_action(
-        decision, goals, constitution, brain._client, brain._model
-    )
+    goals = brain.goals
+    safe, reason = await shield.check(decision, goals)
     if not safe:
         await storage.emit_event("heartbeat_report", {
             "feed_summary": feed_lines, "decision": action,
@@ -178,13 +180,14 @@ async def _manual_heartbeat(
                 title=post_data["title"],
                 content=post_data["content"],
             )
-            await storage.save_own_post(post)
-            await storage.add_digest_item("post", {"id": post.id, "title": post.title, "submolt": post.submolt})
-            await storage.audit("post", {
-                "submolt": post.submolt, "title": post.title,
-                "content": post.content, "post_id": post.id,
-                "manual": True,
-            })
+            async with storage.transaction():
+                await storage.save_own_post(post)
+                await storage.add_digest_item("post", {"id": post.id, "title": post.title, "submolt": post.submolt})
+                await storage.audit("post", {
+                    "submolt": post.submolt, "title": post.title,
+                    "content": post.content, "post_id": post.id,
+                    "manual": True,
+                })
             action_detail = (
                 f"Posted in s/{post.submolt}:\n"
                 f"  Title: {post.title}\n"
@@ -206,14 +209,15 @@ async def _manual_heartbeat(
             text = await brain.generate_comment(target, existing_comments)
             if text:
                 comment = await moltbook.create_comment(post_id, text)
-                await storage.save_own_comment(comment)
-                await storage.add_digest_item("comment", {"post_id": post_id, "post_title": target.title, "content": text[:100]})
-                await storage.mark_seen(post_id, interacted=True)
-                await storage.audit("comment", {
-                    "post_id": post_id, "post_title": target.title,
-                    "post_author": target.author, "comment_text": text,
-                    "manual": True,
-                })
+                async with storage.transaction():
+                    await storage.save_own_comment(comment)
+                    await storage.add_digest_item("comment", {"post_id": post_id, "post_title": target.title, "content": text[:100]})
+                    await storage.mark_seen(post_id, interacted=True)
+                    await storage.audit("comment", {
+                        "post_id": post_id, "post_title": target.title,
+                        "post_author": target.author, "comment_text": text,
+                        "manual": True,
+                    })
                 action_detail = (
                     f"Commented on '{target.title}' by {target.author}:\n"
                     f"  {text[:300]}"
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime, timezone
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import AsyncIterator
 
 import aiosqlite
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+from src import jsonutil
 
 
 _SCHEMA = """
@@ -37,7 +49,7 @@ CREATE TABLE IF NOT EXISTS seen_posts (
 CREATE TABLE IF NOT EXISTS tasks (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     type TEXT,
-    payload TEXT,
+    payload BLOB,
     status TEXT DEFAULT 'pending',
     result TEXT,
     created_at TEXT,
@@ -52,7 +64,7 @@ CREATE TABLE IF NOT EXISTS watched_agents (
 CREATE TABLE IF NOT EXISTS digest_items (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     type TEXT,
-    data TEXT,
+    data BLOB,
     reported INTEGER DEFAULT 0,
     created_at TEXT
 );
@@ -78,7 +90,7 @@ CREATE TABLE IF NOT EXISTS episodes (
     type TEXT NOT NULL,
     content TEXT NOT NULL,
     importance REAL DEFAULT 5.0,
-    metadata TEXT,
+    metadata BLOB,
     created_at TEXT
 );
 
@@ -88,7 +100,7 @@ CREATE TABLE IF NOT EXISTS insights (
     category TEXT DEFAULT 'general',
     confidence REAL DEFAULT 0.5,
     evidence_count INTEGER DEFAULT 1,
-    source_episode_ids TEXT,
+    source_episode_ids BLOB,
     created_at TEXT,
     updated_at TEXT
 );
@@ -112,7 +124,7 @@ CREATE TABLE IF NOT EXISTS dm_conversations (
 CREATE TABLE IF NOT EXISTS agent_events (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     type TEXT NOT NULL,
-    data TEXT NOT NULL,
+    data BLOB NOT NULL,
     consumed INTEGER DEFAULT 0,
     created_at TEXT
 );
@@ -120,7 +132,7 @@ CREATE TABLE IF NOT EXISTS agent_events (
 CREATE TABLE IF NOT EXISTS audit_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     type TEXT NOT NULL,
-    data TEXT NOT NULL,
+    data BLOB NOT NULL,
     created_at TEXT
 );
 
@@ -144,11 +156,112 @@ CREATE TABLE IF NOT EXISTS llm_usage_daily (
     completion_tokens INTEGER NOT NULL DEFAULT 0,
     PRIMARY KEY (date, provider, model, action)
 );
+
+CREATE INDEX IF NOT EXISTS idx_own_posts_created_at ON own_posts(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_own_comments_created ON own_comments(created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_pending ON tasks(id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_digest_unreported ON digest_items(id) WHERE reported = 0;
+CREATE INDEX IF NOT EXISTS idx_events_unconsumed ON agent_events(id) WHERE consumed = 0;
+CREATE INDEX IF NOT EXISTS idx_seen_comments_post ON seen_comments(post_id);
+CREATE INDEX IF NOT EXISTS idx_seen_comments_unreplied ON seen_comments(comment_id) WHERE replied = 0;
+CREATE INDEX IF NOT EXISTS idx_episodes_type ON episodes(type, id);
+CREATE INDEX IF NOT EXISTS idx_episodes_importance_created ON episodes(importance, created_at);
+CREATE INDEX IF NOT EXISTS idx_insights_cat_conf ON insights(category, confidence);
+CREATE INDEX IF NOT EXISTS idx_audit_created ON audit_log(created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_type ON audit_log(type, id);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_created ON llm_usage(created_at);
+"""
+
+# Substring search over episode content. The trigram tokenizer keeps LIKE
+# '%kw%' semantics (case-insensitive, keywords of 3+ chars); needs SQLite 3.34+.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS episodes_fts USING fts5(
+    content, content='episodes', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS episodes_fts_ai AFTER INSERT ON episodes BEGIN
+    INSERT INTO episodes_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS episodes_fts_ad AFTER DELETE ON episodes BEGIN
+    INSERT INTO episodes_fts(episodes_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS episodes_fts_au AFTER UPDATE OF content ON episodes BEGIN
+    INSERT INTO episodes_fts(episodes_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO episodes_fts(rowid, content) VALUES (new.id, new.content);
+END;
 """
 
+# File databases only: WAL lets reads proceed during a write, and with
+# synchronous=NORMAL a commit no longer fsyncs the main database file.
+# auto_vacuum only takes effect on a fresh file (or after a full VACUUM).
+# Per-connection settings, applied to the writer and every pooled reader
+_CONNECTION_PRAGMAS = """
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+"""
+
+_PRAGMAS = """
+PRAGMA auto_vacuum=INCREMENTAL;
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA wal_autocheckpoint=1000;
+""" + _CONNECTION_PRAGMAS
+
+# Shared by the single-row and executemany paths, so both reuse one cached statement
+_MARK_SEEN_SQL = (
+    "INSERT INTO seen_posts (post_id, interacted, seen_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(post_id) DO UPDATE SET interacted = MAX(seen_posts.interacted, excluded.interacted)"
+)
+_MARK_COMMENT_SEEN_SQL = (
+    "INSERT OR IGNORE INTO seen_comments (comment_id, post_id, replied, seen_at) "
+    "VALUES (?, ?, ?, ?)"
+)
+
+
+# Under WAL, readers see the last commit without waiting on the writer
+_READER_POOL_SIZE = 2
+
+# Writes through set_state() invalidate the paused flag at once; the TTL only
+# bounds how long an edit made outside this process goes unnoticed
+_PAUSED_TTL = 60.0
+
+# Rows per fetchmany() round-trip for streaming reads
+_STREAM_BATCH = 128
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER on older builds
+_MAX_SQL_VARS = 999
+
+
+def _chunked(items: list, size: int = _MAX_SQL_VARS):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@lru_cache(maxsize=64)
+def _placeholders(n: int) -> str:
+    return ",".join("?" * n)
+
+
+def _row_to_dict(row: aiosqlite.Row, json_field: str, empty: type = dict) -> dict:
+    """Copy a row into a dict, decoding its JSON column (``empty()`` when NULL)."""
+    d = dict(row)
+    raw = d[json_field]
+    d[json_field] = jsonutil.loads(raw) if raw else empty()
+    return d
+
 
 def _now() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    # Seconds are plenty for every range scan here and keep the indexed columns shorter;
+    # mixed-precision values still sort correctly as text
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _day_range(now: datetime) -> tuple[str, str]:
+    """Half-open ``[today, tomorrow)`` bounds: matches ``LIKE 'YYYY-MM-DD%'`` but can use an index."""
+    return now.strftime("%Y-%m-%d"), (now + timedelta(days=1)).strftime("%Y-%m-%d")
 
 
 def _ts(value: datetime | None) -> str:
@@ -161,397 +274,538 @@ class Storage:
     def __init__(self, db_path: str = "data/agent.db") -> None:
         self._db_path = db_path
         self._db: aiosqlite.Connection | None = None
+        # Writes from concurrent tasks share one connection; the lock keeps
+        # each task's transaction() to itself
+        self._write_lock = asyncio.Lock()
+        self._tx_task: asyncio.Task | None = None
+        self._fts = False
+        self._paused_cache: tuple[float, bool] | None = None
+        # Read-only connections for SELECT-only methods (file databases only)
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._reader_conns: list[aiosqlite.Connection] = []
 
     async def init(self) -> None:
-        self._db = await aiosqlite.connect(self._db_path)
+        # Every query here is a fixed SQL string; a larger statement cache keeps them all prepared
+        self._db = await aiosqlite.connect(self._db_path, cached_statements=256)
         self._db.row_factory = aiosqlite.Row
+        if self._db_path != ":memory:":
+            await self._db.executescript(_PRAGMAS)
         await self._db.executescript(_SCHEMA)
         await self._db.commit()
+        self._fts = await self._init_fts()
+        await self._init_stats()
+        if self._db_path != ":memory:":
+            for _ in range(_READER_POOL_SIZE):
+                conn = await aiosqlite.connect(self._db_path, cached_statements=256)
+                conn.row_factory = aiosqlite.Row
+                await conn.executescript(_CONNECTION_PRAGMAS)
+                await conn.execute("PRAGMA query_only=1")
+                self._reader_conns.append(conn)
+                self._readers.put_nowait(conn)
+
+    async def _init_stats(self) -> None:
+        """Run ANALYZE once so the planner has index stats from the first query.
+
+        After that, PRAGMA optimize (daily maintenance and close()) keeps them fresh.
+        """
+        cur = await self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if await cur.fetchone() is None:
+            await self._db.execute("ANALYZE")
+            await self._db.commit()
+
+    async def _init_fts(self) -> bool:
+        """Create the episode search index; False if this SQLite lacks FTS5 trigram."""
+        cur = await self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'episodes_fts'")
+        existed = await cur.fetchone() is not None
+        try:
+            await self._db.executescript(_FTS_SCHEMA)
+        except aiosqlite.OperationalError:
+            return False
+        if not existed:
+            # Index episodes written before the table existed
+            await self._db.execute("INSERT INTO episodes_fts(episodes_fts) VALUES ('rebuild')")
+            await self._db.commit()
+        return True
 
     async def close(self) -> None:
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns.clear()
+        self._readers = asyncio.Queue()
         if self._db:
-            await self._db.close()
-            self._db = None
+            async with self._write_lock:
+                # Cheap at shutdown: only re-analyzes tables whose stats have drifted
+                await self._db.execute("PRAGMA optimize")
+                await self._db.close()
+                self._db = None
 
     @property
     def db(self) -> aiosqlite.Connection:
         assert self._db is not None, "Storage not initialized — call init() first"
         return self._db
 
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Check out a read-only connection.
+
+        Falls back to the writer for in-memory databases and inside
+        transaction(), where reads must see the uncommitted writes.
+        """
+        if not self._reader_conns or self._owns_tx():
+            yield self.db
+            return
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
+    def _owns_tx(self) -> bool:
+        return self._tx_task is not None and self._tx_task is asyncio.current_task()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Storage]:
+        """Group several writes into a single commit (rolled back on error).
+
+        Every write method runs in one of these, and blocks from different
+        tasks wait on a shared lock, so a rollback only ever discards the
+        block's own writes. A nested block in the same task joins the
+        outermost one and commits or rolls back with it.
+        """
+        if self._owns_tx():
+            yield self
+            return
+        async with self._write_lock:
+            self._tx_task = asyncio.current_task()
+            try:
+                yield self
+            except BaseException:
+                await self.db.rollback()
+                raise
+            else:
+                await self.db.commit()
+            finally:
+                self._tx_task = None
+
     # ── State KV ──────────────────────────────────────────────
 
     async def get_state(self, key: str) -> str | None:
-        cur = await self.db.execute("SELECT value FROM state WHERE key = ?", (key,))
-        row = await cur.fetchone()
-        return row["value"] if row else None
+        async with self._reader() as db:
+            cur = await db.execute("SELECT value FROM state WHERE key = ?", (key,))
+            row = await cur.fetchone()
+            return row["value"] if row else None
+
+    async def is_paused(self) -> bool:
+        """Whether the agent is paused, cached in memory between writes."""
+        now = time.monotonic()
+        cached = self._paused_cache
+        if cached is not None and now - cached[0] < _PAUSED_TTL:
+            return cached[1]
+        paused = await self.get_state("paused") == "1"
+        self._paused_cache = (now, paused)
+        return paused
 
     async def set_state(self, key: str, value: str) -> None:
-        await self.db.execute(
-            "INSERT INTO state (key, value, updated_at) VALUES (?, ?, ?) "
-            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
-            (key, value, _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT INTO state (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, value, _now()),
+            )
+        if key == "paused":
+            self._paused_cache = None
 
     async def set_state_default(self, key: str, value: str) -> None:
         """Set state only if key doesn't exist yet (atomic, no race)."""
-        await self.db.execute(
-            "INSERT OR IGNORE INTO state (key, value, updated_at) VALUES (?, ?, ?)",
-            (key, value, _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT OR IGNORE INTO state (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, value, _now()),
+            )
+        if key == "paused":
+            self._paused_cache = None
 
     # ── Own posts / comments ──────────────────────────────────
 
     async def save_own_post(self, post) -> None:
-        await self.db.execute(
-            "INSERT OR REPLACE INTO own_posts (id, submolt, title, content, created_at) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (post.id, post.submolt, post.title, post.content, _ts(post.created_at)),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT OR REPLACE INTO own_posts (id, submolt, title, content, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (post.id, post.submolt, post.title, post.content, _ts(post.created_at)),
+            )
 
     async def save_own_comment(self, comment) -> None:
-        await self.db.execute(
-            "INSERT OR REPLACE INTO own_comments (id, post_id, content, created_at) "
-            "VALUES (?, ?, ?, ?)",
-            (comment.id, comment.post_id, comment.content, _ts(comment.created_at)),
-        )
-        await self.db.commit()
-
-    async def get_own_posts(self, limit: int = 50) -> list[dict]:
-        cur = await self.db.execute(
-            "SELECT * FROM own_posts ORDER BY created_at DESC LIMIT ?", (limit,)
-        )
-        rows = await cur.fetchall()
-        return [dict(r) for r in rows]
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT OR REPLACE INTO own_comments (id, post_id, content, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (comment.id, comment.post_id, comment.content, _ts(comment.created_at)),
+            )
+
+    async def get_own_posts(self, limit: int = 50, since_iso: str | None = None) -> list[dict]:
+        async with self._reader() as db:
+            if since_iso is None:
+                cur = await db.execute(
+                    "SELECT * FROM own_posts ORDER BY created_at DESC LIMIT ?", (limit,)
+                )
+            else:
+                cur = await db.execute(
+                    "SELECT * FROM own_posts WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?",
+                    (since_iso, limit),
+                )
+            rows = await cur.fetchall()
+            return [dict(r) for r in rows]
 
     async def get_today_comment_count(self) -> int:
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        cur = await self.db.execute(
-            "SELECT COUNT(*) as cnt FROM own_comments WHERE created_at LIKE ?",
-            (f"{today}%",),
-        )
-        row = await cur.fetchone()
-        return row["cnt"]
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT COUNT(*) as cnt FROM own_comments WHERE created_at >= ? AND created_at < ?",
+                _day_range(datetime.now(timezone.utc)),
+            )
+            row = await cur.fetchone()
+            return row["cnt"]
 
     # ── Seen posts ────────────────────────────────────────────
 
     async def mark_seen(self, post_id: str, interacted: bool = False) -> None:
-        await self.db.execute(
-            "INSERT INTO seen_posts (post_id, interacted, seen_at) VALUES (?, ?, ?) "
-            "ON CONFLICT(post_id) DO UPDATE SET interacted = MAX(seen_posts.interacted, excluded.interacted)",
-            (post_id, int(interacted), _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                _MARK_SEEN_SQL,
+                (post_id, int(interacted), _now()),
+            )
+
+    async def mark_seen_many(self, post_ids: list[str], interacted: bool = False) -> None:
+        """Mark a batch of posts as seen in a single transaction."""
+        if not post_ids:
+            return
+        now = _now()
+        async with self.transaction():
+            await self.db.executemany(
+                _MARK_SEEN_SQL,
+                [(post_id, int(interacted), now) for post_id in post_ids],
+            )
 
     async def is_seen(self, post_id: str) -> bool:
-        cur = await self.db.execute(
-            "SELECT 1 FROM seen_posts WHERE post_id = ?", (post_id,)
-        )
-        return await cur.fetchone() is not None
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT 1 FROM seen_posts WHERE post_id = ?", (post_id,)
+            )
+            return await cur.fetchone() is not None
 
     # ── Tasks ─────────────────────────────────────────────────
 
     async def add_task(self, type: str, payload: dict) -> int:
-        cur = await self.db.execute(
-            "INSERT INTO tasks (type, payload, status, created_at) VALUES (?, ?, 'pending', ?)",
-            (type, json.dumps(payload), _now()),
-        )
-        await self.db.commit()
-        return cur.lastrowid  # type: ignore[return-value]
+        async with self.transaction():
+            cur = await self.db.execute(
+                "INSERT INTO tasks (type, payload, status, created_at) VALUES (?, ?, 'pending', ?) RETURNING id",
+                (type, jsonutil.dumps_bytes(payload), _now()),
+            )
+            row = await cur.fetchone()
+        return row["id"]
 
     async def get_pending_tasks(self) -> list[dict]:
-        cur = await self.db.execute(
-            "SELECT * FROM tasks WHERE status = 'pending' ORDER BY id"
-        )
-        rows = await cur.fetchall()
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["payload"] = json.loads(d["payload"]) if d["payload"] else {}
-            result.append(d)
-        return result
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT * FROM tasks WHERE status = 'pending' ORDER BY id"
+            )
+            rows = await cur.fetchall()
+            return [_row_to_dict(r, "payload") for r in rows]
 
     async def complete_task(self, task_id: int, result: dict) -> None:
-        await self.db.execute(
-            "UPDATE tasks SET status = 'done', result = ?, completed_at = ? WHERE id = ?",
-            (json.dumps(result), _now(), task_id),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "UPDATE tasks SET status = 'done', result = ?, completed_at = ? WHERE id = ?",
+                (jsonutil.dumps(result), _now(), task_id),
+            )
 
     async def fail_task(self, task_id: int, error: str) -> None:
-        await self.db.execute(
-            "UPDATE tasks SET status = 'failed', result = ?, completed_at = ? WHERE id = ?",
-            (json.dumps({"error": error}), _now(), task_id),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "UPDATE tasks SET status = 'failed', result = ?, completed_at = ? WHERE id = ?",
+                (jsonutil.dumps({"error": error}), _now(), task_id),
+            )
 
     # ── Watched agents ────────────────────────────────────────
 
     async def watch_agent(self, name: str) -> None:
-        await self.db.execute(
-            "INSERT OR IGNORE INTO watched_agents (name, added_at) VALUES (?, ?)",
-            (name, _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT OR IGNORE INTO watched_agents (name, added_at) VALUES (?, ?)",
+                (name, _now()),
+            )
 
     async def unwatch_agent(self, name: str) -> None:
-        await self.db.execute("DELETE FROM watched_agents WHERE name = ?", (name,))
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute("DELETE FROM watched_agents WHERE name = ?", (name,))
 
     async def get_watched_agents(self) -> list[str]:
-        cur = await self.db.execute(
-            "SELECT name FROM watched_agents ORDER BY added_at"
-        )
-        rows = await cur.fetchall()
-        return [r["name"] for r in rows]
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT name FROM watched_agents ORDER BY added_at"
+            )
+            rows = await cur.fetchall()
+            return [r["name"] for r in rows]
 
     # ── Digest ────────────────────────────────────────────────
 
     async def add_digest_item(self, type: str, data: dict) -> None:
-        await self.db.execute(
-            "INSERT INTO digest_items (type, data, reported, created_at) VALUES (?, ?, 0, ?)",
-            (type, json.dumps(data), _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT INTO digest_items (type, data, reported, created_at) VALUES (?, ?, 0, ?)",
+                (type, jsonutil.dumps_bytes(data), _now()),
+            )
 
     async def get_unreported_digest(self) -> list[dict]:
-        cur = await self.db.execute(
-            "SELECT * FROM digest_items WHERE reported = 0 ORDER BY id"
-        )
-        rows = await cur.fetchall()
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["data"] = json.loads(d["data"]) if d["data"] else {}
-            result.append(d)
-        return result
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT * FROM digest_items WHERE reported = 0 ORDER BY id"
+            )
+            rows = await cur.fetchall()
+            return [_row_to_dict(r, "data") for r in rows]
 
     async def mark_digest_reported(self, ids: list[int]) -> None:
         if not ids:
             return
-        placeholders = ",".join("?" * len(ids))
-        await self.db.execute(
-            f"UPDATE digest_items SET reported = 1 WHERE id IN ({placeholders})",
-            ids,
-        )
-        await self.db.commit()
+        async with self.transaction():
+            for chunk in _chunked(ids):
+                await self.db.execute(
+                    f"UPDATE digest_items SET reported = 1 WHERE id IN ({_placeholders(len(chunk))})",
+                    chunk,
+                )
 
     # ── Strategy versions ─────────────────────────────────────
 
     async def save_strategy_version(
         self, version: int, yaml_text: str, parent: int | None, trigger: str, perf: dict | None = None
     ) -> None:
-        await self.db.execute(
-            "INSERT OR REPLACE INTO strategy_versions "
-            "(version, strategy_yaml, parent_version, trigger, performance_snapshot, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (version, yaml_text, parent, trigger, json.dumps(perf) if perf else None, _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT OR REPLACE INTO strategy_versions "
+                "(version, strategy_yaml, parent_version, trigger, performance_snapshot, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (version, yaml_text, parent, trigger, jsonutil.dumps(perf) if perf else None, _now()),
+            )
 
     async def get_strategy_version(self, version: int) -> dict | None:
-        cur = await self.db.execute(
-            "SELECT * FROM strategy_versions WHERE version = ?", (version,)
-        )
-        row = await cur.fetchone()
-        return dict(row) if row else None
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT * FROM strategy_versions WHERE version = ?", (version,)
+            )
+            row = await cur.fetchone()
+            return dict(row) if row else None
 
     async def get_latest_strategy_version(self) -> dict | None:
-        cur = await self.db.execute(
-            "SELECT * FROM strategy_versions ORDER BY version DESC LIMIT 1"
-        )
-        row = await cur.fetchone()
-        return dict(row) if row else None
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT * FROM strategy_versions ORDER BY version DESC LIMIT 1"
+            )
+            row = await cur.fetchone()
+            return dict(row) if row else None
 
     async def get_strategy(self) -> dict | None:
         """Get latest strategy as parsed dict, or None if no versions saved."""
         row = await self.get_latest_strategy_version()
         if row and row.get("strategy_yaml"):
-            import yaml
-            return yaml.safe_load(row["strategy_yaml"])
+            return yaml.load(row["strategy_yaml"], Loader=SafeLoader)
         return None
 
     async def get_strategy_history(self, limit: int = 10) -> list[dict]:
-        cur = await self.db.execute(
-            "SELECT * FROM strategy_versions ORDER BY version DESC LIMIT ?", (limit,)
-        )
-        rows = await cur.fetchall()
-        return [dict(r) for r in rows]
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT * FROM strategy_versions ORDER BY version DESC LIMIT ?", (limit,)
+            )
+            rows = await cur.fetchall()
+            return [dict(r) for r in rows]
 
     # ── Core memory ────────────────────────────────────────────
 
     async def get_core_block(self, block: str) -> dict | None:
-        cur = await self.db.execute(
-            "SELECT * FROM core_memory WHERE block = ?", (block,)
-        )
-        row = await cur.fetchone()
-        return dict(row) if row else None
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT * FROM core_memory WHERE block = ?", (block,)
+            )
+            row = await cur.fetchone()
+            return dict(row) if row else None
 
     async def set_core_block(self, block: str, content: str, char_limit: int = 1000) -> None:
-        await self.db.execute(
-            "INSERT INTO core_memory (block, content, char_limit, updated_at) VALUES (?, ?, ?, ?) "
-            "ON CONFLICT(block) DO UPDATE SET content = excluded.content, updated_at = excluded.updated_at",
-            (block, content[:char_limit], char_limit, _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT INTO core_memory (block, content, char_limit, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(block) DO UPDATE SET content = excluded.content, updated_at = excluded.updated_at",
+                (block, content[:char_limit], char_limit, _now()),
+            )
 
     async def get_all_core_blocks(self) -> list[dict]:
-        cur = await self.db.execute("SELECT * FROM core_memory ORDER BY block")
-        rows = await cur.fetchall()
-        return [dict(r) for r in rows]
+        async with self._reader() as db:
+            cur = await db.execute("SELECT * FROM core_memory ORDER BY block")
+            rows = await cur.fetchall()
+            return [dict(r) for r in rows]
 
     # ── Episodes ───────────────────────────────────────────────
 
     async def add_episode(
         self, type: str, content: str, importance: float = 5.0, metadata: dict | None = None
     ) -> int:
-        cur = await self.db.execute(
-            "INSERT INTO episodes (type, content, importance, metadata, created_at) VALUES (?, ?, ?, ?, ?)",
-            (type, content, importance, json.dumps(metadata) if metadata else None, _now()),
-        )
-        await self.db.commit()
-        return cur.lastrowid  # type: ignore[return-value]
-
-    async def get_recent_episodes(self, limit: int = 50, type: str | None = None) -> list[dict]:
-        if type:
-            cur = await self.db.execute(
-                "SELECT * FROM episodes WHERE type = ? ORDER BY id DESC LIMIT ?", (type, limit)
-            )
-        else:
+        async with self.transaction():
             cur = await self.db.execute(
-                "SELECT * FROM episodes ORDER BY id DESC LIMIT ?", (limit,)
+                "INSERT INTO episodes (type, content, importance, metadata, created_at) VALUES (?, ?, ?, ?, ?) "
+                "RETURNING id",
+                (type, content, importance, jsonutil.dumps_bytes(metadata) if metadata else None, _now()),
             )
-        rows = await cur.fetchall()
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["metadata"] = json.loads(d["metadata"]) if d["metadata"] else {}
-            result.append(d)
-        return result
+            row = await cur.fetchone()
+        return row["id"]
+
+    async def get_recent_episodes(self, limit: int = 50, type: str | None = None) -> list[dict]:
+        async with self._reader() as db:
+            if type:
+                cur = await db.execute(
+                    "SELECT * FROM episodes WHERE type = ? ORDER BY id DESC LIMIT ?", (type, limit)
+                )
+            else:
+                cur = await db.execute(
+                    "SELECT * FROM episodes ORDER BY id DESC LIMIT ?", (limit,)
+                )
+            rows = await cur.fetchall()
+            return [_row_to_dict(r, "metadata") for r in rows]
 
     async def get_episodes_older_than(self, hours: int, importance_below: float) -> list[dict]:
-        from datetime import timedelta
-        cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-        cur = await self.db.execute(
-            "SELECT * FROM episodes WHERE created_at < ? AND importance < ? ORDER BY id",
-            (cutoff, importance_below),
-        )
-        rows = await cur.fetchall()
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["metadata"] = json.loads(d["metadata"]) if d["metadata"] else {}
-            result.append(d)
-        return result
+        async with self._reader() as db:
+            cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+            cur = await db.execute(
+                "SELECT * FROM episodes WHERE created_at < ? AND importance < ? ORDER BY id",
+                (cutoff, importance_below),
+            )
+            rows = await cur.fetchall()
+            return [_row_to_dict(r, "metadata") for r in rows]
 
     async def delete_episodes(self, ids: list[int]) -> None:
         if not ids:
             return
-        placeholders = ",".join("?" * len(ids))
-        await self.db.execute(f"DELETE FROM episodes WHERE id IN ({placeholders})", ids)
-        await self.db.commit()
+        async with self.transaction():
+            for chunk in _chunked(ids):
+                await self.db.execute(
+                    f"DELETE FROM episodes WHERE id IN ({_placeholders(len(chunk))})", chunk,
+                )
 
     async def get_episode_count(self) -> int:
-        cur = await self.db.execute("SELECT COUNT(*) as cnt FROM episodes")
-        row = await cur.fetchone()
-        return row["cnt"]
+        async with self._reader() as db:
+            cur = await db.execute("SELECT COUNT(*) as cnt FROM episodes")
+            row = await cur.fetchone()
+            return row["cnt"]
 
     async def search_episodes(self, keywords: list[str], limit: int = 20) -> list[dict]:
         if not keywords:
             return await self.get_recent_episodes(limit)
-        conditions = " OR ".join(["content LIKE ?"] * len(keywords))
-        params = [f"%{kw}%" for kw in keywords]
-        params.append(limit)  # type: ignore[arg-type]
-        cur = await self.db.execute(
-            f"SELECT * FROM episodes WHERE ({conditions}) ORDER BY id DESC LIMIT ?",
-            params,
-        )
-        rows = await cur.fetchall()
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["metadata"] = json.loads(d["metadata"]) if d["metadata"] else {}
-            result.append(d)
-        return result
+        async with self._reader() as db:
+            if self._fts and all(len(kw) >= 3 for kw in keywords):
+                match = " OR ".join('"' + kw.replace('"', '""') + '"' for kw in keywords)
+                cur = await db.execute(
+                    "SELECT e.* FROM episodes_fts JOIN episodes e ON e.id = episodes_fts.rowid "
+                    "WHERE episodes_fts MATCH ? ORDER BY e.id DESC LIMIT ?",
+                    (match, limit),
+                )
+            else:
+                conditions = " OR ".join(["content LIKE ?"] * len(keywords))
+                params = [f"%{kw}%" for kw in keywords]
+                params.append(limit)  # type: ignore[arg-type]
+                cur = await db.execute(
+                    f"SELECT * FROM episodes WHERE ({conditions}) ORDER BY id DESC LIMIT ?",
+                    params,
+                )
+            rows = await cur.fetchall()
+            return [_row_to_dict(r, "metadata") for r in rows]
 
     # ── Insights ───────────────────────────────────────────────
 
     async def add_insight(
         self, insight: str, category: str = "general", confidence: float = 0.5, source_episode_ids: list[int] | None = None
     ) -> int:
-        cur = await self.db.execute(
-            "INSERT INTO insights (insight, category, confidence, evidence_count, source_episode_ids, created_at, updated_at) "
-            "VALUES (?, ?, ?, 1, ?, ?, ?)",
-            (insight, category, confidence, json.dumps(source_episode_ids or []), _now(), _now()),
-        )
-        await self.db.commit()
-        return cur.lastrowid  # type: ignore[return-value]
-
-    async def get_insights(self, category: str | None = None, min_confidence: float = 0.3) -> list[dict]:
-        if category:
-            cur = await self.db.execute(
-                "SELECT * FROM insights WHERE category = ? AND confidence >= ? ORDER BY confidence DESC",
-                (category, min_confidence),
-            )
-        else:
+        now = _now()
+        async with self.transaction():
             cur = await self.db.execute(
-                "SELECT * FROM insights WHERE confidence >= ? ORDER BY confidence DESC",
-                (min_confidence,),
+                "INSERT INTO insights (insight, category, confidence, evidence_count, source_episode_ids, created_at, updated_at) "
+                "VALUES (?, ?, ?, 1, ?, ?, ?) RETURNING id",
+                (insight, category, confidence, jsonutil.dumps_bytes(source_episode_ids or []), now, now),
             )
-        rows = await cur.fetchall()
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["source_episode_ids"] = json.loads(d["source_episode_ids"]) if d["source_episode_ids"] else []
-            result.append(d)
-        return result
+            row = await cur.fetchone()
+        return row["id"]
+
+    async def get_insights(self, category: str | None = None, min_confidence: float = 0.3) -> list[dict]:
+        async with self._reader() as db:
+            if category:
+                cur = await db.execute(
+                    "SELECT * FROM insights WHERE category = ? AND confidence >= ? ORDER BY confidence DESC",
+                    (category, min_confidence),
+                )
+            else:
+                cur = await db.execute(
+                    "SELECT * FROM insights WHERE confidence >= ? ORDER BY confidence DESC",
+                    (min_confidence,),
+                )
+            rows = await cur.fetchall()
+            return [_row_to_dict(r, "source_episode_ids", list) for r in rows]
 
     async def reinforce_insight(self, insight_id: int) -> None:
-        await self.db.execute(
-            "UPDATE insights SET evidence_count = evidence_count + 1, "
-            "confidence = MIN(1.0, confidence + 0.1), updated_at = ? WHERE id = ?",
-            (_now(), insight_id),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "UPDATE insights SET evidence_count = evidence_count + 1, "
+                "confidence = MIN(1.0, confidence + 0.1), updated_at = ? WHERE id = ?",
+                (_now(), insight_id),
+            )
 
     async def suppress_insight(self, insight_id: int) -> None:
-        await self.db.execute(
-            "UPDATE insights SET confidence = MAX(0.0, confidence - 0.2), updated_at = ? WHERE id = ?",
-            (_now(), insight_id),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "UPDATE insights SET confidence = MAX(0.0, confidence - 0.2), updated_at = ? WHERE id = ?",
+                (_now(), insight_id),
+            )
 
     async def delete_low_confidence_insights(self, threshold: float = 0.1) -> int:
-        cur = await self.db.execute(
-            "DELETE FROM insights WHERE confidence < ?", (threshold,)
-        )
-        await self.db.commit()
+        async with self.transaction():
+            cur = await self.db.execute(
+                "DELETE FROM insights WHERE confidence < ?", (threshold,)
+            )
         return cur.rowcount
 
     # ── Seen comments ──────────────────────────────────────────
 
     async def mark_comment_seen(self, comment_id: str, post_id: str, replied: bool = False) -> None:
-        await self.db.execute(
-            "INSERT OR IGNORE INTO seen_comments (comment_id, post_id, replied, seen_at) "
-            "VALUES (?, ?, ?, ?)",
-            (comment_id, post_id, int(replied), _now()),
-        )
-        await self.db.commit()
-
-    async def get_seen_comment_ids(self, post_id: str) -> set[str]:
-        cur = await self.db.execute(
-            "SELECT comment_id FROM seen_comments WHERE post_id = ?", (post_id,)
-        )
-        rows = await cur.fetchall()
-        return {r["comment_id"] for r in rows}
+        async with self.transaction():
+            await self.db.execute(
+                _MARK_COMMENT_SEEN_SQL,
+                (comment_id, post_id, int(replied), _now()),
+            )
+
+    async def mark_comments_seen_many(self, rows: list[tuple[str, str, bool]]) -> None:
+        """Mark a batch of ``(comment_id, post_id, replied)`` rows seen in one transaction."""
+        if not rows:
+            return
+        now = _now()
+        async with self.transaction():
+            await self.db.executemany(
+                _MARK_COMMENT_SEEN_SQL,
+                [(comment_id, post_id, int(replied), now) for comment_id, post_id, replied in rows],
+            )
+
+    async def filter_unseen_comments(self, comment_ids: list[str]) -> set[str]:
+        """Return the subset of ``comment_ids`` not yet marked seen, across all posts."""
+        async with self._reader() as db:
+            seen: set[str] = set()
+            for chunk in _chunked(comment_ids):
+                placeholders = _placeholders(len(chunk))
+                cur = await db.execute(
+                    f"SELECT comment_id FROM seen_comments WHERE comment_id IN ({placeholders})",
+                    chunk,
+                )
+                seen.update(r["comment_id"] for r in await cur.fetchall())
+            return set(comment_ids) - seen
 
     async def mark_comment_replied(self, comment_id: str) -> None:
-        await self.db.execute(
-            "UPDATE seen_comments SET replied = 1 WHERE comment_id = ?", (comment_id,)
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "UPDATE seen_comments SET replied = 1 WHERE comment_id = ?", (comment_id,)
+            )
 
     # ── DM conversations ──────────────────────────────────────
 
@@ -559,146 +813,134 @@ class Storage:
         self, conversation_id: str, other_agent: str, last_seen_message_id: str | None = None
     ) -> None:
         now = _now()
-        await self.db.execute(
-            "INSERT INTO dm_conversations (conversation_id, other_agent, last_seen_message_id, created_at, updated_at) "
-            "VALUES (?, ?, ?, ?, ?) "
-            "ON CONFLICT(conversation_id) DO UPDATE SET updated_at = excluded.updated_at",
-            (conversation_id, other_agent, last_seen_message_id, now, now),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT INTO dm_conversations (conversation_id, other_agent, last_seen_message_id, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(conversation_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (conversation_id, other_agent, last_seen_message_id, now, now),
+            )
 
     async def get_dm_conversation(self, conversation_id: str) -> dict | None:
-        cur = await self.db.execute(
-            "SELECT * FROM dm_conversations WHERE conversation_id = ?", (conversation_id,)
-        )
-        row = await cur.fetchone()
-        return dict(row) if row else None
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT * FROM dm_conversations WHERE conversation_id = ?", (conversation_id,)
+            )
+            row = await cur.fetchone()
+            return dict(row) if row else None
 
     async def set_dm_needs_human(self, conversation_id: str, flag: bool) -> None:
-        await self.db.execute(
-            "UPDATE dm_conversations SET needs_human = ?, updated_at = ? WHERE conversation_id = ?",
-            (int(flag), _now(), conversation_id),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "UPDATE dm_conversations SET needs_human = ?, updated_at = ? WHERE conversation_id = ?",
+                (int(flag), _now(), conversation_id),
+            )
 
     async def update_dm_last_seen(self, conversation_id: str, message_id: str) -> None:
-        await self.db.execute(
-            "UPDATE dm_conversations SET last_seen_message_id = ?, updated_at = ? WHERE conversation_id = ?",
-            (message_id, _now(), conversation_id),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "UPDATE dm_conversations SET last_seen_message_id = ?, updated_at = ? WHERE conversation_id = ?",
+                (message_id, _now(), conversation_id),
+            )
 
     # ── Agent events ─────────────────────────────────────────
 
     async def emit_event(self, type: str, data: dict) -> None:
-        await self.db.execute(
-            "INSERT INTO agent_events (type, data, consumed, created_at) VALUES (?, ?, 0, ?)",
-            (type, json.dumps(data), _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT INTO agent_events (type, data, consumed, created_at) VALUES (?, ?, 0, ?)",
+                (type, jsonutil.dumps_bytes(data), _now()),
+            )
 
     async def consume_events(self) -> list[dict]:
-        cur = await self.db.execute(
-            "SELECT * FROM agent_events WHERE consumed = 0 ORDER BY id"
-        )
-        rows = await cur.fetchall()
-        if not rows:
-            return []
-        events = []
-        ids = []
-        for r in rows:
-            d = dict(r)
-            d["data"] = json.loads(d["data"]) if d["data"] else {}
-            events.append(d)
-            ids.append(d["id"])
-        placeholders = ",".join("?" * len(ids))
-        await self.db.execute(
-            f"UPDATE agent_events SET consumed = 1 WHERE id IN ({placeholders})", ids
-        )
-        await self.db.commit()
-        return events
+        async with self.transaction():
+            # Claim and read in one statement; RETURNING order is unspecified, so sort by id
+            cur = await self.db.execute(
+                "UPDATE agent_events SET consumed = 1 WHERE consumed = 0 "
+                "RETURNING id, type, data, created_at"
+            )
+            rows = await cur.fetchall()
+        return [_row_to_dict(r, "data") for r in sorted(rows, key=lambda r: r["id"])]
 
     # ── Audit log ─────────────────────────────────────────────
 
     async def audit(self, type: str, data: dict) -> None:
-        await self.db.execute(
-            "INSERT INTO audit_log (type, data, created_at) VALUES (?, ?, ?)",
-            (type, json.dumps(data, default=str), _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT INTO audit_log (type, data, created_at) VALUES (?, ?, ?)",
+                (type, jsonutil.dumps_bytes(data, default=str), _now()),
+            )
 
-    async def get_audit_since(self, hours: int = 24) -> list[dict]:
-        from datetime import timedelta
+    async def iter_audit_since(self, hours: int = 24) -> AsyncIterator[dict]:
+        """Stream audit entries from the last ``hours``, oldest first.
+
+        Rows are fetched ``_STREAM_BATCH`` at a time, so a busy day never sits
+        in memory as one list. The reader is held until the iterator finishes.
+        """
         cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-        cur = await self.db.execute(
-            "SELECT * FROM audit_log WHERE created_at >= ? ORDER BY id",
-            (cutoff,),
-        )
-        rows = await cur.fetchall()
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["data"] = json.loads(d["data"]) if d["data"] else {}
-            result.append(d)
-        return result
+        async with self._reader() as db:
+            cur = await db.execute(
+                "SELECT * FROM audit_log WHERE created_at >= ? ORDER BY id",
+                (cutoff,),
+            )
+            cur.arraysize = _STREAM_BATCH
+            while rows := await cur.fetchmany():
+                for r in rows:
+                    yield _row_to_dict(r, "data")
 
     async def get_audit_log(
         self, type: str | None = None, limit: int = 50, offset: int = 0
     ) -> list[dict]:
-        if type:
-            cur = await self.db.execute(
-                "SELECT * FROM audit_log WHERE type = ? ORDER BY id DESC LIMIT ? OFFSET ?",
-                (type, limit, offset),
-            )
-        else:
-            cur = await self.db.execute(
-                "SELECT * FROM audit_log ORDER BY id DESC LIMIT ? OFFSET ?",
-                (limit, offset),
-            )
-        rows = await cur.fetchall()
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["data"] = json.loads(d["data"]) if d["data"] else {}
-            result.append(d)
-        return result
+        async with self._reader() as db:
+            if type:
+                cur = await db.execute(
+                    "SELECT * FROM audit_log WHERE type = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+                    (type, limit, offset),
+                )
+            else:
+                cur = await db.execute(
+                    "SELECT * FROM audit_log ORDER BY id DESC LIMIT ? OFFSET ?",
+                    (limit, offset),
+                )
+            rows = await cur.fetchall()
+            return [_row_to_dict(r, "data") for r in rows]
 
     # ── LLM usage ─────────────────────────────────────────────
 
     async def save_llm_usage(
         self, provider: str, model: str, action: str, prompt_tokens: int, completion_tokens: int,
     ) -> None:
-        await self.db.execute(
-            "INSERT INTO llm_usage (provider, model, action, prompt_tokens, completion_tokens, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (provider, model, action, prompt_tokens, completion_tokens, _now()),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            await self.db.execute(
+                "INSERT INTO llm_usage (provider, model, action, prompt_tokens, completion_tokens, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (provider, model, action, prompt_tokens, completion_tokens, _now()),
+            )
 
     async def compact_llm_usage(self, keep_days: int = 7) -> int:
         """Aggregate detailed rows older than keep_days into llm_usage_daily."""
         from datetime import timedelta
         cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).strftime("%Y-%m-%d")
 
-        # Aggregate old rows into daily table
-        await self.db.execute(
-            "INSERT INTO llm_usage_daily (date, provider, model, action, requests, prompt_tokens, completion_tokens) "
-            "SELECT substr(created_at, 1, 10), provider, model, action, "
-            "COUNT(*), SUM(prompt_tokens), SUM(completion_tokens) "
-            "FROM llm_usage WHERE created_at < ? "
-            "GROUP BY substr(created_at, 1, 10), provider, model, action "
-            "ON CONFLICT(date, provider, model, action) DO UPDATE SET "
-            "requests = requests + excluded.requests, "
-            "prompt_tokens = prompt_tokens + excluded.prompt_tokens, "
-            "completion_tokens = completion_tokens + excluded.completion_tokens",
-            (f"{cutoff}T00:00:00",),
-        )
-        # Delete compacted rows
-        cur = await self.db.execute(
-            "DELETE FROM llm_usage WHERE created_at < ?",
-            (f"{cutoff}T00:00:00",),
-        )
-        await self.db.commit()
+        async with self.transaction():
+            # Aggregate old rows into daily table
+            await self.db.execute(
+                "INSERT INTO llm_usage_daily (date, provider, model, action, requests, prompt_tokens, completion_tokens) "
+                "SELECT substr(created_at, 1, 10), provider, model, action, "
+                "COUNT(*), SUM(prompt_tokens), SUM(completion_tokens) "
+                "FROM llm_usage WHERE created_at < ? "
+                "GROUP BY substr(created_at, 1, 10), provider, model, action "
+                "ON CONFLICT(date, provider, model, action) DO UPDATE SET "
+                "requests = requests + excluded.requests, "
+                "prompt_tokens = prompt_tokens + excluded.prompt_tokens, "
+                "completion_tokens = completion_tokens + excluded.completion_tokens",
+                (f"{cutoff}T00:00:00",),
+            )
+            # Delete compacted rows
+            cur = await self.db.execute(
+                "DELETE FROM llm_usage WHERE created_at < ?",
+                (f"{cutoff}T00:00:00",),
+            )
         return cur.rowcount
 
     async def get_llm_usage_report(self) -> str:
@@ -734,30 +976,31 @@ class Storage:
                 lines.append(f"  {r['action']}: {r['requests']} req, {fmt(r['pt'] + r['ct'])} tok")
             return lines
 
-        # Today: from detailed llm_usage
-        cur = await self.db.execute(
-            "SELECT provider, model, action, "
-            "COUNT(*) as requests, SUM(prompt_tokens) as pt, SUM(completion_tokens) as ct "
-            "FROM llm_usage WHERE created_at LIKE ? "
-            "GROUP BY provider, model, action ORDER BY provider, model, requests DESC",
-            (f"{today}%",),
-        )
-        today_rows = [dict(r) for r in await cur.fetchall()]
-
-        # All time totals: detailed + aggregated
-        cur2 = await self.db.execute(
-            "SELECT provider, model, "
-            "SUM(requests) as requests, SUM(pt) as pt, SUM(ct) as ct FROM ("
-            "  SELECT provider, model, COUNT(*) as requests, "
-            "    SUM(prompt_tokens) as pt, SUM(completion_tokens) as ct "
-            "  FROM llm_usage GROUP BY provider, model "
-            "  UNION ALL "
-            "  SELECT provider, model, SUM(requests), "
-            "    SUM(prompt_tokens), SUM(completion_tokens) "
-            "  FROM llm_usage_daily GROUP BY provider, model"
-            ") GROUP BY provider, model ORDER BY requests DESC",
-        )
-        total_rows = [dict(r) for r in await cur2.fetchall()]
+        async with self._reader() as db:
+            # Today: from detailed llm_usage
+            cur = await db.execute(
+                "SELECT provider, model, action, "
+                "COUNT(*) as requests, SUM(prompt_tokens) as pt, SUM(completion_tokens) as ct "
+                "FROM llm_usage WHERE created_at LIKE ? "
+                "GROUP BY provider, model, action ORDER BY provider, model, requests DESC",
+                (f"{today}%",),
+            )
+            today_rows = [dict(r) for r in await cur.fetchall()]
+
+            # All time totals: detailed + aggregated
+            cur2 = await db.execute(
+                "SELECT provider, model, "
+                "SUM(requests) as requests, SUM(pt) as pt, SUM(ct) as ct FROM ("
+                "  SELECT provider, model, COUNT(*) as requests, "
+                "    SUM(prompt_tokens) as pt, SUM(completion_tokens) as ct "
+                "  FROM llm_usage GROUP BY provider, model "
+                "  UNION ALL "
+                "  SELECT provider, model, SUM(requests), "
+                "    SUM(prompt_tokens), SUM(completion_tokens) "
+                "  FROM llm_usage_daily GROUP BY provider, model"
+                ") GROUP BY provider, model ORDER BY requests DESC",
+            )
+            total_rows = [dict(r) for r in await cur2.fetchall()]
 
         if not today_rows and not total_rows:
             return "No LLM usage recorded yet."
@@ -777,57 +1020,63 @@ class Storage:
 
         return "\n".join(lines).strip()
 
-    # ── Stats ─────────────────────────────────────────────────
-
-    async def get_stats(self) -> dict:
-        posts_cur = await self.db.execute("SELECT COUNT(*) as cnt FROM own_posts")
-        posts_row = await posts_cur.fetchone()
-
-        comments_today = await self.get_today_comment_count()
-
-        seen_cur = await self.db.execute("SELECT COUNT(*) as cnt FROM seen_posts")
-        seen_row = await seen_cur.fetchone()
-
-        pending_cur = await self.db.execute(
-            "SELECT COUNT(*) as cnt FROM tasks WHERE status = 'pending'"
-        )
-        pending_row = await pending_cur.fetchone()
+    # ── Maintenance ───────────────────────────────────────────
 
-        watched_cur = await self.db.execute(
-            "SELECT COUNT(*) as cnt FROM watched_agents"
-        )
-        watched_row = await watched_cur.fetchone()
+    async def maintenance(self, pages: int = 1000) -> None:
+        """Return up to ``pages`` free pages to the OS and refresh planner stats."""
+        if self._owns_tx():
+            raise RuntimeError("maintenance() would commit the enclosing transaction()")
+        # incremental_vacuum frees one page per step; execute() stops after the
+        # first, while executescript() runs each statement to completion. Its
+        # implicit COMMIT is harmless here: the write lock means nothing else
+        # is pending on the connection.
+        async with self._write_lock:
+            await self.db.executescript(f"PRAGMA incremental_vacuum({int(pages)}); PRAGMA optimize;")
 
-        unreplied_cur = await self.db.execute(
-            "SELECT COUNT(*) as cnt FROM seen_comments WHERE replied = 0"
-        )
-        unreplied_row = await unreplied_cur.fetchone()
+    async def checkpoint(self) -> None:
+        """Fold the WAL back into the database file and truncate it to zero bytes."""
+        async with self.transaction():
+            await self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
-        last_post_cur = await self.db.execute(
-            "SELECT created_at FROM own_posts ORDER BY created_at DESC LIMIT 1"
-        )
-        last_post_row = await last_post_cur.fetchone()
-        last_post_at = last_post_row["created_at"] if last_post_row else None
+    # ── Stats ─────────────────────────────────────────────────
 
-        hours_since_last_post = None
-        if last_post_at:
-            try:
-                last_dt = datetime.fromisoformat(last_post_at)
-                delta = datetime.now(timezone.utc) - last_dt
-                hours_since_last_post = round(delta.total_seconds() / 3600, 1)
-            except (ValueError, TypeError):
-                pass
-
-        paused = await self.get_state("paused")
-
-        return {
-            "total_posts": posts_row["cnt"],
-            "comments_today": comments_today,
-            "seen_posts": seen_row["cnt"],
-            "pending_tasks": pending_row["cnt"],
-            "watched_agents": watched_row["cnt"],
-            "unreplied_comments": unreplied_row["cnt"],
-            "last_post_at": last_post_at,
-            "hours_since_last_post": hours_since_last_post,
-            "paused": paused == "1" if paused else False,
-        }
+    async def get_stats(self) -> dict:
+        async with self._reader() as db:
+            now = datetime.now(timezone.utc)
+            cur = await db.execute(
+                "SELECT "
+                "(SELECT COUNT(*) FROM own_posts) AS total_posts, "
+                "(SELECT COUNT(*) FROM own_comments WHERE created_at >= ? AND created_at < ?) AS comments_today, "
+                "(SELECT COUNT(*) FROM seen_posts) AS seen_posts, "
+                "(SELECT COUNT(*) FROM tasks WHERE status = 'pending') AS pending_tasks, "
+                "(SELECT COUNT(*) FROM watched_agents) AS watched_agents, "
+                "(SELECT COUNT(*) FROM seen_comments WHERE replied = 0) AS unreplied_comments, "
+                "(SELECT created_at FROM own_posts ORDER BY created_at DESC LIMIT 1) AS last_post_at, "
+                "(SELECT value FROM state WHERE key = 'paused') AS paused",
+                _day_range(now),
+            )
+            row = await cur.fetchone()
+            last_post_at = row["last_post_at"]
+
+            hours_since_last_post = None
+            if last_post_at:
+                try:
+                    last_dt = datetime.fromisoformat(last_post_at)
+                    delta = now - last_dt
+                    hours_since_last_post = round(delta.total_seconds() / 3600, 1)
+                except (ValueError, TypeError):
+                    pass
+
+            paused = row["paused"]
+
+            return {
+                "total_posts": row["total_posts"],
+                "comments_today": row["comments_today"],
+                "seen_posts": row["seen_posts"],
+                "pending_tasks": row["pending_tasks"],
+                "watched_agents": row["watched_agents"],
+                "unreplied_comments": row["unreplied_comments"],
+                "last_post_at": last_post_at,
+                "hours_since_last_post": hours_since_last_post,
+                "paused": paused == "1" if paused else False,
+            }
@@ -40,10 +40,11 @@ async def _on_bot_membership(event: ChatMemberUpdated, storage: Storage) -> None
         return
 
     if new_status in ("administrator", "member"):
-        await storage.set_state("channel_id", str(chat.id))
-        for key in ("active", "posts", "comments", "replies", "dms",
-                     "reflection", "alerts", "daily_summary"):
-            await storage.set_state_default(f"channel_{key}", "1")
+        async with storage.transaction():
+            await storage.set_state("channel_id", str(chat.id))
+            for key in ("active", "posts", "comments", "replies", "dms",
+                         "reflection", "alerts", "daily_summary"):
+                await storage.set_state_default(f"channel_{key}", "1")
         logger.info("Bot added to channel %s (%s)", chat.id, chat.title)
     elif new_status in ("left", "kicked"):
         await storage.set_state("channel_id", "")